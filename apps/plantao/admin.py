@@ -2,6 +2,12 @@ from django.contrib import admin
 from .models import Colaborador, Plantao, EscalaAutomatica, TrocaPlantao, Notificacao, TecnicoCampo, PlantaoTecnico, TrocaPlantaoTecnico, EscalaAutomaticaTecnico
 
 
+def _is_changelist(request):
+    """Indica se a requisição é a listagem (changelist) do admin"""
+    match = request.resolver_match
+    return match is not None and match.url_name.endswith('_changelist')
+
+
 @admin.register(Colaborador)
 class ColaboradorAdmin(admin.ModelAdmin):
     list_display = ['ordem_fila', 'nome_completo', 'ativo', 'user']
@@ -10,6 +16,7 @@ class ColaboradorAdmin(admin.ModelAdmin):
     search_fields = ['nome_completo', 'user__username']
     ordering = ['ordem_fila']
     list_editable = ['ordem_fila', 'ativo']
+    list_select_related = ['user']
     
     fieldsets = (
         ('Informações Básicas', {
@@ -23,11 +30,21 @@ class ColaboradorAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def get_queryset(self, request):
+        """Na listagem busca apenas as colunas exibidas em list_display"""
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            qs = qs.select_related('user').only(
+                'id', 'ordem_fila', 'nome_completo', 'ativo', 'user__id', 'user__username'
+            )
+        return qs
 
 
 @admin.register(Plantao)
 class PlantaoAdmin(admin.ModelAdmin):
     list_display = ['data', 'dia_semana', 'turno', 'colaborador', 'hora_inicio', 'hora_fim']
+    list_select_related = ['colaborador']
     list_filter = ['dia_semana', 'turno', 'data']
     search_fields = ['colaborador__nome_completo', 'observacoes']
     date_hierarchy = 'data'
@@ -49,6 +66,16 @@ class PlantaoAdmin(admin.ModelAdmin):
     
     readonly_fields = ['criado_em', 'atualizado_em']
     
+    def get_queryset(self, request):
+        """Na listagem busca apenas as colunas exibidas em list_display"""
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            qs = qs.select_related('colaborador').only(
+                'id', 'data', 'dia_semana', 'turno', 'hora_inicio', 'hora_fim',
+                'colaborador__nome_completo'
+            )
+        return qs
+    
     def get_readonly_fields(self, request, obj=None):
         """Tornar hora_inicio e hora_fim readonly pois são preenchidos automaticamente"""
         if obj:  # Editando
@@ -59,6 +86,7 @@ class PlantaoAdmin(admin.ModelAdmin):
 @admin.register(EscalaAutomatica)
 class EscalaAutomaticaAdmin(admin.ModelAdmin):
     list_display = ['data_inicio', 'semanas_gerar', 'ativa', 'criada_em', 'criada_por']
+    list_select_related = ['criada_por']
     list_filter = ['ativa', 'data_inicio']
     date_hierarchy = 'criada_em'
     ordering = ['-criada_em']
@@ -74,15 +102,24 @@ class EscalaAutomaticaAdmin(admin.ModelAdmin):
 @admin.register(TrocaPlantao)
 class TrocaPlantaoAdmin(admin.ModelAdmin):
     list_display = ['solicitante', 'plantao_solicitante', 'destinatario', 'plantao_destinatario', 'status', 'criado_em']
+    list_select_related = ['solicitante', 'destinatario', 'plantao_solicitante__colaborador', 'plantao_destinatario__colaborador']
     list_filter = ['status', 'criado_em']
     search_fields = ['solicitante__nome_completo', 'destinatario__nome_completo']
+    raw_id_fields = ['solicitante', 'plantao_solicitante', 'destinatario', 'plantao_destinatario']
 
 @admin.register(Notificacao)
 class NotificacaoAdmin(admin.ModelAdmin):
     list_display = ['colaborador', 'tipo', 'titulo', 'lida', 'criado_em']
+    list_select_related = ['colaborador']
     list_filter = ['tipo', 'lida', 'criado_em']
     search_fields = ['colaborador__nome_completo', 'titulo']
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """O __str__ da troca lê solicitante e destinatario; evita N+1 no select"""
+        if db_field.name == 'troca':
+            kwargs['queryset'] = TrocaPlantao.objects.select_related('solicitante', 'destinatario')
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
 @admin.register(TecnicoCampo)
 class TecnicoCampoAdmin(admin.ModelAdmin):
     list_display = ['nome_completo', 'telefone', 'ordem_fila', 'ativo']
@@ -92,15 +129,29 @@ class TecnicoCampoAdmin(admin.ModelAdmin):
 @admin.register(PlantaoTecnico)
 class PlantaoTecnicoAdmin(admin.ModelAdmin):
     list_display = ['data', 'tipo', 'tecnico_principal', 'tecnico_dupla', 'hora_inicio', 'hora_fim']
+    list_select_related = ['tecnico_principal', 'tecnico_dupla']
     list_filter = ['tipo', 'data']
     search_fields = ['tecnico_principal__nome_completo', 'tecnico_dupla__nome_completo']
 
+    def get_queryset(self, request):
+        """Na listagem busca apenas as colunas exibidas em list_display"""
+        qs = super().get_queryset(request)
+        if _is_changelist(request):
+            qs = qs.select_related('tecnico_principal', 'tecnico_dupla').only(
+                'id', 'data', 'tipo', 'hora_inicio', 'hora_fim',
+                'tecnico_principal__nome_completo', 'tecnico_dupla__nome_completo'
+            )
+        return qs
+
 @admin.register(TrocaPlantaoTecnico)
 class TrocaPlantaoTecnicoAdmin(admin.ModelAdmin):
     list_display = ['solicitante', 'destinatario', 'status', 'criado_em']
+    list_select_related = ['solicitante', 'destinatario']
     list_filter = ['status', 'criado_em']
+    raw_id_fields = ['solicitante', 'plantao_solicitante', 'destinatario', 'plantao_destinatario']
 
 @admin.register(EscalaAutomaticaTecnico)
 class EscalaAutomaticaTecnicoAdmin(admin.ModelAdmin):
     list_display = ['data_inicio', 'semanas_gerar', 'criada_por', 'criada_em']
+    list_select_related = ['criada_por']
     list_filter = ['criada_em']
\ No newline at end of file
@@ -1,4 +1,5 @@
 from django import forms
+from django.forms.models import ModelChoiceIterator
 from .models import Plantao, Colaborador, EscalaAutomatica
 from datetime import datetime, timedelta
 
@@ -8,13 +9,83 @@ _TEXTAREA = _INPUT + ' resize-none'
 _CHECKBOX = 'w-4 h-4 accent-[#E94920] cursor-pointer'
 
 
+class _ColaboradorAtivoChoiceIterator(ModelChoiceIterator):
+    """
+    Com o queryset padrão do campo, gera as opções a partir da lista (pk, nome) do
+    campo, sem instanciar um Colaborador por opção. Qualquer outro queryset (atribuído por quem
+    usa o campo) segue o ModelChoiceIterator, para que as opções exibidas sejam
+    sempre as mesmas que a validação aceita.
+    """
+
+    def __iter__(self):
+        if not self.field.usa_queryset_padrao():
+            yield from super().__iter__()
+            return
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        yield from self.field.colaboradores()
+
+    def __len__(self):
+        if not self.field.usa_queryset_padrao():
+            return super().__len__()
+        return len(self.field.colaboradores()) + (1 if self.field.empty_label is not None else 0)
+
+    def __bool__(self):
+        if not self.field.usa_queryset_padrao():
+            return super().__bool__()
+        return self.field.empty_label is not None or bool(self.field.colaboradores())
+
+
+class ColaboradorAtivoChoiceField(forms.ModelChoiceField):
+    """Select de colaboradores ativos: renderiza a partir de uma lista (pk, nome) buscada
+    uma vez por form, mas valida contra o queryset e devolve a instância em cleaned_data"""
+    iterator = _ColaboradorAtivoChoiceIterator
+
+    def __init__(self, queryset=None, **kwargs):
+        # Sem queryset explícito o campo usa o dos ativos, que é o que a lista (pk, nome)
+        # representa; só esse objeto fica marcado como "padrão". O select só exibe o
+        # nome, então a validação também busca apenas as colunas usadas no __str__
+        padrao = queryset is None
+        if padrao:
+            queryset = (
+                Colaborador.objects.filter(ativo=True)
+                .only('id', 'nome_completo')
+                .order_by('ordem_fila', 'nome_completo')
+            )
+        super().__init__(queryset, **kwargs)
+        self._queryset_padrao = self.queryset if padrao else None
+        self._colaboradores = None
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        # Cada form recebe uma cópia do campo com queryset.all(): a marca vai junto e a
+        # lista é buscada de novo, então nunca sobrevive de uma requisição para outra
+        result._queryset_padrao = result.queryset if self.usa_queryset_padrao() else None
+        result._colaboradores = None
+        return result
+
+    def usa_queryset_padrao(self):
+        return self._queryset_padrao is not None and self.queryset is self._queryset_padrao
+
+    def colaboradores(self):
+        """Lista (pk, nome) do queryset padrão, buscada uma vez por instância do form"""
+        if self._colaboradores is None:
+            self._colaboradores = list(self._queryset_padrao.values_list('pk', 'nome_completo'))
+        return self._colaboradores
+
+
 class PlantaoForm(forms.ModelForm):
+    # Declarado no form para usar o queryset padrão (ativos, na ordem da fila) e a lista (pk, nome)
+    colaborador = ColaboradorAtivoChoiceField(
+        widget=forms.Select(attrs={'class': _SELECT}),
+        label='Colaborador',
+    )
+
     class Meta:
         model = Plantao
         fields = ['colaborador', 'data', 'turno', 'observacoes']
         widgets = {
             'data': forms.DateInput(attrs={'type': 'date', 'class': _INPUT}),
-            'colaborador': forms.Select(attrs={'class': _SELECT}),
             'turno': forms.Select(attrs={'class': _SELECT}),
             'observacoes': forms.Textarea(attrs={
                 'class': _TEXTAREA,
@@ -23,16 +94,11 @@ class PlantaoForm(forms.ModelForm):
             }),
         }
         labels = {
-            'colaborador': 'Colaborador',
             'data': 'Data do Plantão',
             'turno': 'Turno',
             'observacoes': 'Observações',
         }
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['colaborador'].queryset = Colaborador.objects.filter(ativo=True)
-
 
 class ColaboradorForm(forms.ModelForm):
     class Meta:
@@ -81,15 +147,14 @@ class FiltroPlantaoForm(forms.Form):
         widget=forms.DateInput(attrs={'type': 'date', 'class': _INPUT}),
         label='Data Fim'
     )
-    colaborador = forms.ModelChoiceField(
-        queryset=Colaborador.objects.filter(ativo=True),
+    colaborador = ColaboradorAtivoChoiceField(
         required=False,
         widget=forms.Select(attrs={'class': _SELECT}),
         label='Colaborador',
         empty_label='Todos'
     )
     dia_semana = forms.ChoiceField(
-        choices=[('', 'Todos')] + Plantao.DIAS_SEMANA,
+        choices=[('', 'Todos')] + Plantao.DiaSemana.choices,
         required=False,
         widget=forms.Select(attrs={'class': _SELECT}),
         label='Dia da Semana'
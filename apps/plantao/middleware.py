@@ -0,0 +1,33 @@
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .utils import get_user_type
+
+
+class UserTypeMiddleware:
+    """
+    Disponibiliza request.user_type ('admin', 'tecnico', 'colaborador' ou None).
+    Assim como request.user, é resolvido sob demanda: requests que não consultam o
+    tipo não fazem nenhuma query extra, e os que consultam fazem uma só.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.user_type = SimpleLazyObject(lambda: get_user_type(request.user))
+        return self.get_response(request)
+
+
+class HojeMiddleware:
+    """
+    Disponibiliza request.hoje: a data local (TIME_ZONE) calculada uma vez por request,
+    para que todas as comparações da mesma view usem o mesmo "hoje".
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.hoje = timezone.localdate()
+        return self.get_response(request)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-15 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0004_add_dias_semana_avulso_turnos'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(fields=['colaborador', 'lida', '-criado_em'], name='notif_colab_lida_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantao',
+            index=models.Index(fields=['colaborador', 'data'], name='plantao_colab_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantaotecnico',
+            index=models.Index(fields=['tecnico_principal', 'data'], name='plantaotec_principal_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trocaplantao',
+            index=models.Index(fields=['status', '-criado_em'], name='troca_status_criado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trocaplantaotecnico',
+            index=models.Index(fields=['status', '-criado_em'], name='trocatec_status_criado_idx'),
+        ),
+    ]
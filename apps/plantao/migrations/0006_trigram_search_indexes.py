@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+# Índices GIN/trigram para as buscas ILIKE '%termo%' do admin (search_fields).
+# Só existem no PostgreSQL; nos demais bancos a migração não faz nada.
+_INDICES_TRIGRAM = [
+    ('colab_nome_trgm', 'plantao_colaborador', 'nome_completo'),
+    ('tecnico_nome_trgm', 'plantao_tecnicocampo', 'nome_completo'),
+    ('plantao_obs_trgm', 'plantao_plantao', 'observacoes'),
+]
+
+
+def criar_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nome, tabela, coluna in _INDICES_TRIGRAM:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {nome} ON {tabela} USING gin ({coluna} gin_trgm_ops)'
+        )
+
+
+def remover_indices_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nome, _tabela, _coluna in _INDICES_TRIGRAM:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {nome}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0005_add_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(criar_indices_trigram, remover_indices_trigram),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0006_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(condition=models.Q(('lida', False)), fields=['colaborador', '-criado_em'], name='notif_unread_idx'),
+        ),
+    ]
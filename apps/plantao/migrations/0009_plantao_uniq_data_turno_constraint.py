@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-15 09:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0008_timestamps_db_default'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='plantao',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='plantao',
+            constraint=models.UniqueConstraint(fields=('data', 'turno'), name='uniq_data_turno'),
+        ),
+    ]
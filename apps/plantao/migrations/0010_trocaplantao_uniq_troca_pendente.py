@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-15 10:06
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def cancelar_pendentes_duplicadas(apps, schema_editor):
+    # Antes da constraint era possível repetir a mesma solicitação pendente: fica só a
+    # mais recente de cada par, as demais são canceladas (senão o AddConstraint falha)
+    TrocaPlantao = apps.get_model('plantao', 'TrocaPlantao')
+    pendentes = TrocaPlantao.objects.filter(status='PENDENTE')
+    grupos = (
+        pendentes.order_by()
+        .values('solicitante', 'plantao_solicitante', 'plantao_destinatario')
+        .annotate(total=Count('id'))
+        .filter(total__gt=1)
+    )
+    agora = timezone.now()
+    for grupo in grupos:
+        ids = list(
+            pendentes.filter(
+                solicitante=grupo['solicitante'],
+                plantao_solicitante=grupo['plantao_solicitante'],
+                plantao_destinatario=grupo['plantao_destinatario'],
+            )
+            .order_by('-criado_em', '-id')
+            .values_list('id', flat=True)
+        )
+        TrocaPlantao.objects.filter(id__in=ids[1:]).update(status='CANCELADA', respondido_em=agora)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0009_plantao_uniq_data_turno_constraint'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancelar_pendentes_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='trocaplantao',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDENTE')), fields=('solicitante', 'plantao_solicitante', 'plantao_destinatario'), name='uniq_troca_pendente'),
+        ),
+    ]
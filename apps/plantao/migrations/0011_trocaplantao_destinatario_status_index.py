@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-15 10:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0010_trocaplantao_uniq_troca_pendente'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trocaplantao',
+            index=models.Index(fields=['destinatario', 'status', '-criado_em'], name='troca_dest_status_idx'),
+        ),
+    ]
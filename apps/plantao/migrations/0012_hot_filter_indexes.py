@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-15 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0011_trocaplantao_destinatario_status_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(fields=['colaborador', '-criado_em'], name='notif_colab_criado_idx'),
+        ),
+        # Coberto pelo índice acima (lista completa) e pelo parcial notif_unread_idx
+        # (não lidas); mantê-lo só custaria escrita
+        migrations.RemoveIndex(
+            model_name='notificacao',
+            name='notif_colab_lida_idx',
+        ),
+        migrations.AddIndex(
+            model_name='plantao',
+            index=models.Index(fields=['data', 'hora_inicio'], name='plantao_data_hora_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trocaplantao',
+            index=models.Index(fields=['solicitante', '-criado_em'], name='troca_solic_criado_idx'),
+        ),
+    ]
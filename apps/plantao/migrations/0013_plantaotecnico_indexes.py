@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-15 10:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0012_hot_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plantaotecnico',
+            index=models.Index(fields=['tecnico_dupla', 'data'], name='plantaotec_dupla_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantaotecnico',
+            index=models.Index(fields=['data', 'hora_inicio'], name='plantaotec_data_hora_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-15 10:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('plantao', '0013_plantaotecnico_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='colaborador',
+            index=models.Index(fields=['ordem_fila', 'nome_completo'], name='colab_ordem_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tecnicocampo',
+            index=models.Index(fields=['ordem_fila', 'nome_completo'], name='tecnico_ordem_idx'),
+        ),
+    ]
@@ -1,9 +1,36 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
+from django.db.models.functions import Now
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-from datetime import datetime, time
-from django.utils import timezone
+from datetime import time
+from types import MappingProxyType
+
+
+# Horários fixos de cada turno SAC (objetos time são imutáveis, podem ser compartilhados).
+# MappingProxyType deixa o mapa somente leitura, seguro para compartilhar entre threads.
+_TURNO_HORARIOS = MappingProxyType({
+    'SABADO_TARDE1':   (time(13, 0), time(17, 0)),
+    'SABADO_TARDE2':   (time(17, 0), time(21, 0)),
+    'DOMINGO_MANHA':   (time(8,  0), time(13, 0)),
+    'DOMINGO_TARDE1':  (time(13, 0), time(17, 0)),
+    'DOMINGO_TARDE2':  (time(17, 0), time(21, 0)),
+    'AVULSO_MANHA':    (time(8,  0), time(13, 0)),
+    'AVULSO_TARDE1':   (time(13, 0), time(17, 0)),
+    'AVULSO_TARDE2':   (time(17, 0), time(21, 0)),
+    'AVULSO_DIA_TODO': (time(8,  0), time(18, 0)),
+})
+_SEM_HORARIO = (None, None)
+
+# Códigos/nomes dos dias indexados por date.weekday()
+_WEEKDAY_TO_DIA = ('SEG', 'TER', 'QUA', 'QUI', 'SEX', 'SAB', 'DOM')
+_DIAS_PT = ('Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo')
+
+# Horários fixos dos plantões de técnicos
+_HORARIO_SABADO_DUPLA = (time(14, 0), time(18, 0))
+_HORARIO_DIA_TODO = (time(8, 0), time(18, 0))
+
 
 class Colaborador(models.Model):
     """Modelo para representar os colaboradores que fazem plantão"""
@@ -16,35 +43,49 @@ class Colaborador(models.Model):
         verbose_name = "Colaborador"
         verbose_name_plural = "Colaboradores"
         ordering = ['ordem_fila', 'nome_completo']
+        indexes = [
+            # Ordenação padrão das listas e MAX(ordem_fila) da próxima posição na fila
+            models.Index(fields=['ordem_fila', 'nome_completo'], name='colab_ordem_idx'),
+        ]
     
     def __str__(self):
         return self.nome_completo
 
 
+class PlantaoQuerySet(models.QuerySet):
+
+    def para_usuario(self, user):
+        """Plantões visíveis para o usuário: colaborador SAC só vê os seus, os demais veem todos"""
+        from .utils import get_user_colaborador, get_user_type
+
+        if get_user_type(user) != 'colaborador':
+            return self
+        colaborador = get_user_colaborador(user)
+        return self.filter(colaborador=colaborador) if colaborador else self.none()
+
+
 class Plantao(models.Model):
     """Modelo principal para gerenciar plantões"""
     
-    DIAS_SEMANA = [
-        ('SEG', 'Segunda-feira'),
-        ('TER', 'Terça-feira'),
-        ('QUA', 'Quarta-feira'),
-        ('QUI', 'Quinta-feira'),
-        ('SEX', 'Sexta-feira'),
-        ('SAB', 'Sábado'),
-        ('DOM', 'Domingo'),
-    ]
-
-    TURNOS = [
-        ('SABADO_TARDE1',  'Sábado 13:00 – 17:00'),
-        ('SABADO_TARDE2',  'Sábado 17:00 – 21:00'),
-        ('DOMINGO_MANHA',  'Domingo 08:00 – 13:00'),
-        ('DOMINGO_TARDE1', 'Domingo 13:00 – 17:00'),
-        ('DOMINGO_TARDE2', 'Domingo 17:00 – 21:00'),
-        ('AVULSO_MANHA',   'Avulso 08:00 – 13:00'),
-        ('AVULSO_TARDE1',  'Avulso 13:00 – 17:00'),
-        ('AVULSO_TARDE2',  'Avulso 17:00 – 21:00'),
-        ('AVULSO_DIA_TODO','Avulso 08:00 – 18:00'),
-    ]
+    class DiaSemana(models.TextChoices):
+        SEG = 'SEG', 'Segunda-feira'
+        TER = 'TER', 'Terça-feira'
+        QUA = 'QUA', 'Quarta-feira'
+        QUI = 'QUI', 'Quinta-feira'
+        SEX = 'SEX', 'Sexta-feira'
+        SAB = 'SAB', 'Sábado'
+        DOM = 'DOM', 'Domingo'
+
+    class Turno(models.TextChoices):
+        SABADO_TARDE1   = 'SABADO_TARDE1',   'Sábado 13:00 – 17:00'
+        SABADO_TARDE2   = 'SABADO_TARDE2',   'Sábado 17:00 – 21:00'
+        DOMINGO_MANHA   = 'DOMINGO_MANHA',   'Domingo 08:00 – 13:00'
+        DOMINGO_TARDE1  = 'DOMINGO_TARDE1',  'Domingo 13:00 – 17:00'
+        DOMINGO_TARDE2  = 'DOMINGO_TARDE2',  'Domingo 17:00 – 21:00'
+        AVULSO_MANHA    = 'AVULSO_MANHA',    'Avulso 08:00 – 13:00'
+        AVULSO_TARDE1   = 'AVULSO_TARDE1',   'Avulso 13:00 – 17:00'
+        AVULSO_TARDE2   = 'AVULSO_TARDE2',   'Avulso 17:00 – 21:00'
+        AVULSO_DIA_TODO = 'AVULSO_DIA_TODO', 'Avulso 08:00 – 18:00'
     
     colaborador = models.ForeignKey(
         Colaborador, 
@@ -52,19 +93,29 @@ class Plantao(models.Model):
         related_name='plantoes'
     )
     data = models.DateField(help_text="Data do plantão")
-    dia_semana = models.CharField(max_length=3, choices=DIAS_SEMANA)
-    turno = models.CharField(max_length=20, choices=TURNOS)
+    dia_semana = models.CharField(max_length=3, choices=DiaSemana.choices)
+    turno = models.CharField(max_length=20, choices=Turno.choices)
     hora_inicio = models.TimeField()
     hora_fim = models.TimeField()
     observacoes = models.TextField(blank=True, null=True)
-    criado_em = models.DateTimeField(auto_now_add=True)
+    criado_em = models.DateTimeField(db_default=Now(), editable=False)
     atualizado_em = models.DateTimeField(auto_now=True)
     
+    objects = PlantaoQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Plantão"
         verbose_name_plural = "Plantões"
         ordering = ['data', 'hora_inicio']
-        unique_together = ['data', 'turno']  # Não pode ter 2 pessoas no mesmo turno
+        constraints = [
+            # Não pode ter 2 pessoas no mesmo turno
+            models.UniqueConstraint(fields=['data', 'turno'], name='uniq_data_turno'),
+        ]
+        indexes = [
+            models.Index(fields=['colaborador', 'data'], name='plantao_colab_data_idx'),
+            # Janela por data já na ordem data/hora_inicio de dashboard, PDF e troca
+            models.Index(fields=['data', 'hora_inicio'], name='plantao_data_hora_idx'),
+        ]
     
     def __str__(self):
         return f"{self.colaborador.nome_completo} - {self.get_dia_semana_display()} {self.data} ({self.hora_inicio} - {self.hora_fim})"
@@ -78,34 +129,66 @@ class Plantao(models.Model):
             if self.hora_fim <= self.hora_inicio:
                 raise ValidationError('Hora de fim deve ser maior que hora de início')
     
-    _DIA_MAP = {0: 'SEG', 1: 'TER', 2: 'QUA', 3: 'QUI', 4: 'SEX', 5: 'SAB', 6: 'DOM'}
-
     @staticmethod
     def get_horarios_por_turno(turno):
-        horarios = {
-            'SABADO_TARDE1':   (time(13, 0), time(17, 0)),
-            'SABADO_TARDE2':   (time(17, 0), time(21, 0)),
-            'DOMINGO_MANHA':   (time(8,  0), time(13, 0)),
-            'DOMINGO_TARDE1':  (time(13, 0), time(17, 0)),
-            'DOMINGO_TARDE2':  (time(17, 0), time(21, 0)),
-            'AVULSO_MANHA':    (time(8,  0), time(13, 0)),
-            'AVULSO_TARDE1':   (time(13, 0), time(17, 0)),
-            'AVULSO_TARDE2':   (time(17, 0), time(21, 0)),
-            'AVULSO_DIA_TODO': (time(8,  0), time(18, 0)),
-        }
-        return horarios.get(turno, (None, None))
+        return _TURNO_HORARIOS.get(turno, _SEM_HORARIO)
+
+    @classmethod
+    def build(cls, colaborador, data, turno, **kwargs):
+        """Instancia um plantão com horários e dia da semana já preenchidos (para bulk_create)"""
+        inicio, fim = cls.get_horarios_por_turno(turno)
+        return cls(
+            colaborador=colaborador,
+            data=data,
+            turno=turno,
+            hora_inicio=inicio,
+            hora_fim=fim,
+            dia_semana=_WEEKDAY_TO_DIA[data.weekday()],
+            **kwargs
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._turno_data_carregados = instance._turno_data_atuais()
+        return instance
+
+    def _turno_data_atuais(self):
+        # Lê do __dict__ para não disparar query em campos adiados (only/defer)
+        return self.__dict__.get('turno'), self.__dict__.get('data')
 
     def save(self, *args, **kwargs):
-        if self.turno:
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            recalcular_turno = 'turno' in update_fields
+            recalcular_data = 'data' in update_fields
+        elif self._state.adding:
+            recalcular_turno = recalcular_data = True
+        else:
+            turno_antigo, data_antiga = getattr(self, '_turno_data_carregados', (None, None))
+            turno_atual, data_atual = self._turno_data_atuais()
+            recalcular_turno = turno_atual != turno_antigo
+            recalcular_data = data_atual != data_antiga
+
+        if recalcular_turno and self.turno:
             inicio, fim = self.get_horarios_por_turno(self.turno)
             if inicio and fim:
                 self.hora_inicio = inicio
                 self.hora_fim = fim
+                if update_fields is not None:
+                    update_fields |= {'hora_inicio', 'hora_fim'}
 
-        if self.data:
-            self.dia_semana = self._DIA_MAP.get(self.data.weekday(), '')
+        if recalcular_data and self.data:
+            self.dia_semana = _WEEKDAY_TO_DIA[self.data.weekday()]
+            if update_fields is not None:
+                update_fields.add('dia_semana')
+
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
 
         super().save(*args, **kwargs)
+        self._turno_data_carregados = self._turno_data_atuais()
 
 
 class EscalaAutomatica(models.Model):
@@ -114,7 +197,7 @@ class EscalaAutomatica(models.Model):
     ativa = models.BooleanField(default=True)
     data_inicio = models.DateField()
     semanas_gerar = models.IntegerField(default=4, help_text="Quantas semanas gerar na escala")
-    criada_em = models.DateTimeField(auto_now_add=True)
+    criada_em = models.DateTimeField(db_default=Now(), editable=False)
     criada_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     
     class Meta:
@@ -128,12 +211,11 @@ class EscalaAutomatica(models.Model):
 class TrocaPlantao(models.Model):
     """Modelo para gerenciar solicitações de troca de plantão"""
     
-    STATUS_CHOICES = [
-        ('PENDENTE', 'Pendente'),
-        ('ACEITA', 'Aceita'),
-        ('RECUSADA', 'Recusada'),
-        ('CANCELADA', 'Cancelada'),
-    ]
+    class Status(models.TextChoices):
+        PENDENTE = 'PENDENTE', 'Pendente'
+        ACEITA = 'ACEITA', 'Aceita'
+        RECUSADA = 'RECUSADA', 'Recusada'
+        CANCELADA = 'CANCELADA', 'Cancelada'
     
     solicitante = models.ForeignKey(
         Colaborador,
@@ -157,68 +239,85 @@ class TrocaPlantao(models.Model):
         related_name='troca_destino'
     )
     
-    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDENTE')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDENTE)
     mensagem = models.TextField(blank=True, null=True)
     
-    criado_em = models.DateTimeField(auto_now_add=True)
+    criado_em = models.DateTimeField(db_default=Now(), editable=False)
     respondido_em = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         verbose_name = "Troca de Plantão"
         verbose_name_plural = "Trocas de Plantões"
         ordering = ['-criado_em']
+        indexes = [
+            models.Index(fields=['status', '-criado_em'], name='troca_status_criado_idx'),
+            # "Trocas recebidas" de minhas_trocas: destinatário + PENDENTE, mais recentes primeiro
+            models.Index(fields=['destinatario', 'status', '-criado_em'], name='troca_dest_status_idx'),
+            # "Trocas solicitadas" de minhas_trocas
+            models.Index(fields=['solicitante', '-criado_em'], name='troca_solic_criado_idx'),
+        ]
+        constraints = [
+            # No máximo uma solicitação pendente para o mesmo par de plantões
+            models.UniqueConstraint(
+                fields=['solicitante', 'plantao_solicitante', 'plantao_destinatario'],
+                condition=Q(status='PENDENTE'),
+                name='uniq_troca_pendente',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.solicitante.nome_completo} ↔ {self.destinatario.nome_completo} ({self.status})"
     
     def aceitar_troca(self):
-        if self.status != 'PENDENTE':
+        if self.status != self.Status.PENDENTE:
             raise ValueError('Apenas trocas pendentes podem ser aceitas')
         
-        temp_colab = self.plantao_solicitante.colaborador
-        self.plantao_solicitante.colaborador = self.plantao_destinatario.colaborador
-        self.plantao_destinatario.colaborador = temp_colab
-        
-        self.plantao_solicitante.save()
-        self.plantao_destinatario.save()
-        
-        self.status = 'ACEITA'
-        self.respondido_em = timezone.now()
-        self.save()
+        with transaction.atomic():
+            # Troca pelos ids: não precisa carregar os colaboradores
+            solicitante, destinatario = self.plantao_solicitante, self.plantao_destinatario
+            solicitante.colaborador_id, destinatario.colaborador_id = (
+                destinatario.colaborador_id, solicitante.colaborador_id
+            )
+            
+            self.plantao_solicitante.save(update_fields=['colaborador', 'atualizado_em'])
+            self.plantao_destinatario.save(update_fields=['colaborador', 'atualizado_em'])
+            
+            self.status = self.Status.ACEITA
+            self.respondido_em = timezone.now()
+            self.save(update_fields=['status', 'respondido_em'])
     
     def recusar_troca(self):
-        if self.status != 'PENDENTE':
+        if self.status != self.Status.PENDENTE:
             raise ValueError('Apenas trocas pendentes podem ser recusadas')
         
-        self.status = 'RECUSADA'
+        self.status = self.Status.RECUSADA
         self.respondido_em = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'respondido_em'])
     
     def cancelar_troca(self):
-        if self.status != 'PENDENTE':
+        if self.status != self.Status.PENDENTE:
             raise ValueError('Apenas trocas pendentes podem ser canceladas')
         
-        self.status = 'CANCELADA'
+        self.status = self.Status.CANCELADA
         self.respondido_em = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'respondido_em'])
 
 
 class Notificacao(models.Model):
     """Sistema de notificações"""
     
-    TIPO_CHOICES = [
-        ('TROCA_SOLICITADA', 'Solicitação de Troca'),
-        ('TROCA_ACEITA', 'Troca Aceita'),
-        ('TROCA_RECUSADA', 'Troca Recusada'),
-        ('TROCA_CANCELADA', 'Troca Cancelada'),
-    ]
+    class Tipo(models.TextChoices):
+        TROCA_SOLICITADA = 'TROCA_SOLICITADA', 'Solicitação de Troca'
+        TROCA_ACEITA = 'TROCA_ACEITA', 'Troca Aceita'
+        TROCA_RECUSADA = 'TROCA_RECUSADA', 'Troca Recusada'
+        TROCA_CANCELADA = 'TROCA_CANCELADA', 'Troca Cancelada'
     
     colaborador = models.ForeignKey(
         Colaborador,
         on_delete=models.CASCADE,
         related_name='notificacoes'
     )
-    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    tipo = models.CharField(max_length=20, choices=Tipo.choices)
     titulo = models.CharField(max_length=200)
     mensagem = models.TextField()
     
@@ -231,19 +330,25 @@ class Notificacao(models.Model):
     )
     
     lida = models.BooleanField(default=False)
-    criado_em = models.DateTimeField(auto_now_add=True)
+    criado_em = models.DateTimeField(db_default=Now(), editable=False)
     
     class Meta:
         verbose_name = "Notificação"
         verbose_name_plural = "Notificações"
         ordering = ['-criado_em']
+        indexes = [
+            # Lista completa (lidas e não lidas) da tela de notificações
+            models.Index(fields=['colaborador', '-criado_em'], name='notif_colab_criado_idx'),
+            # Parcial: só as não lidas (contador do sino e caixa de entrada)
+            models.Index(fields=['colaborador', '-criado_em'], condition=Q(lida=False), name='notif_unread_idx'),
+        ]
     
     def __str__(self):
         return f"{self.colaborador.nome_completo} - {self.titulo}"
     
     def marcar_como_lida(self):
         self.lida = True
-        self.save()
+        self.save(update_fields=['lida'])
 
 # Adicione estes models ao apps/plantao/models.py
 
@@ -267,13 +372,17 @@ class TecnicoCampo(models.Model):
     ordem_fila = models.IntegerField(default=0, help_text="Ordem na rotação de plantões")
     ativo = models.BooleanField(default=True)
     
-    criado_em = models.DateTimeField(auto_now_add=True)
+    criado_em = models.DateTimeField(db_default=Now(), editable=False)
     atualizado_em = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Técnico de Campo"
         verbose_name_plural = "Técnicos de Campo"
         ordering = ['ordem_fila', 'nome_completo']
+        indexes = [
+            # Ordenação padrão das listas e MAX(ordem_fila) da próxima posição na fila
+            models.Index(fields=['ordem_fila', 'nome_completo'], name='tecnico_ordem_idx'),
+        ]
     
     def __str__(self):
         return self.nome_completo
@@ -282,11 +391,10 @@ class TecnicoCampo(models.Model):
 class PlantaoTecnico(models.Model):
     """Modelo para Plantões de Técnicos de Campo"""
     
-    TIPO_CHOICES = [
-        ('SABADO_DUPLA', 'Sábado - Dupla (14:00-18:00)'),
-        ('DOMINGO_SOLO', 'Domingo - Solo (Dia Todo)'),
-        ('AVULSO_SOLO', 'Dia Avulso - Solo (Dia Todo)'),
-    ]
+    class Tipo(models.TextChoices):
+        SABADO_DUPLA = 'SABADO_DUPLA', 'Sábado - Dupla (14:00-18:00)'
+        DOMINGO_SOLO = 'DOMINGO_SOLO', 'Domingo - Solo (Dia Todo)'
+        AVULSO_SOLO = 'AVULSO_SOLO', 'Dia Avulso - Solo (Dia Todo)'
     
     # Técnico principal
     tecnico_principal = models.ForeignKey(
@@ -306,7 +414,7 @@ class PlantaoTecnico(models.Model):
     )
     
     data = models.DateField()
-    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    tipo = models.CharField(max_length=20, choices=Tipo.choices)
     
     # Horários fixos por tipo
     hora_inicio = models.TimeField()
@@ -314,7 +422,7 @@ class PlantaoTecnico(models.Model):
     
     observacoes = models.TextField(blank=True, null=True)
     
-    criado_em = models.DateTimeField(auto_now_add=True)
+    criado_em = models.DateTimeField(db_default=Now(), editable=False)
     atualizado_em = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -322,39 +430,59 @@ class PlantaoTecnico(models.Model):
         verbose_name_plural = "Plantões Técnicos"
         ordering = ['data', 'hora_inicio']
         unique_together = ['data', 'tipo']  # Não pode ter 2 plantões do mesmo tipo no mesmo dia
+        indexes = [
+            models.Index(fields=['tecnico_principal', 'data'], name='plantaotec_principal_data_idx'),
+            # Outro lado do OR "principal ou dupla" do filtro por técnico
+            models.Index(fields=['tecnico_dupla', 'data'], name='plantaotec_dupla_data_idx'),
+            # Janela por data já na ordem data/hora_inicio de dashboard e PDF
+            models.Index(fields=['data', 'hora_inicio'], name='plantaotec_data_hora_idx'),
+        ]
     
     def __str__(self):
-        if self.tipo == 'SABADO_DUPLA' and self.tecnico_dupla:
+        if self.tipo == self.Tipo.SABADO_DUPLA and self.tecnico_dupla:
             return f"{self.tecnico_principal.nome_completo} + {self.tecnico_dupla.nome_completo} - {self.data}"
         return f"{self.tecnico_principal.nome_completo} - {self.data}"
     
+    @classmethod
+    def get_horarios_por_tipo(cls, tipo):
+        if tipo == cls.Tipo.SABADO_DUPLA:
+            return _HORARIO_SABADO_DUPLA
+        return _HORARIO_DIA_TODO  # DOMINGO_SOLO ou AVULSO_SOLO
+
+    @classmethod
+    def build(cls, tecnico_principal, data, tipo, tecnico_dupla=None, **kwargs):
+        """Instancia um plantão com horários já preenchidos (para bulk_create)"""
+        inicio, fim = cls.get_horarios_por_tipo(tipo)
+        return cls(
+            tecnico_principal=tecnico_principal,
+            tecnico_dupla=tecnico_dupla,
+            data=data,
+            tipo=tipo,
+            hora_inicio=inicio,
+            hora_fim=fim,
+            **kwargs
+        )
+
     def save(self, *args, **kwargs):
         # Define horários automaticamente baseado no tipo
-        if self.tipo == 'SABADO_DUPLA':
-            self.hora_inicio = datetime.strptime('14:00', '%H:%M').time()
-            self.hora_fim = datetime.strptime('18:00', '%H:%M').time()
-        else:  # DOMINGO_SOLO ou AVULSO_SOLO
-            self.hora_inicio = datetime.strptime('08:00', '%H:%M').time()
-            self.hora_fim = datetime.strptime('18:00', '%H:%M').time()
+        self.hora_inicio, self.hora_fim = self.get_horarios_por_tipo(self.tipo)
         
         super().save(*args, **kwargs)
     
     @property
     def dia_semana(self):
         """Retorna dia da semana em português"""
-        dias = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
-        return dias[self.data.weekday()]
+        return _DIAS_PT[self.data.weekday()]
 
 
 class TrocaPlantaoTecnico(models.Model):
     """Sistema de troca para técnicos"""
     
-    STATUS_CHOICES = [
-        ('PENDENTE', 'Pendente'),
-        ('ACEITA', 'Aceita'),
-        ('RECUSADA', 'Recusada'),
-        ('CANCELADA', 'Cancelada'),
-    ]
+    class Status(models.TextChoices):
+        PENDENTE = 'PENDENTE', 'Pendente'
+        ACEITA = 'ACEITA', 'Aceita'
+        RECUSADA = 'RECUSADA', 'Recusada'
+        CANCELADA = 'CANCELADA', 'Cancelada'
     
     solicitante = models.ForeignKey(
         TecnicoCampo,
@@ -378,51 +506,56 @@ class TrocaPlantaoTecnico(models.Model):
         related_name='troca_tecnico_destino'
     )
     
-    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDENTE')
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDENTE)
     mensagem = models.TextField(blank=True, null=True)
     
-    criado_em = models.DateTimeField(auto_now_add=True)
+    criado_em = models.DateTimeField(db_default=Now(), editable=False)
     respondido_em = models.DateTimeField(blank=True, null=True)
     
     class Meta:
         verbose_name = "Troca de Plantão - Técnico"
         verbose_name_plural = "Trocas de Plantões - Técnicos"
         ordering = ['-criado_em']
+        indexes = [
+            models.Index(fields=['status', '-criado_em'], name='trocatec_status_criado_idx'),
+        ]
     
     def __str__(self):
         return f"{self.solicitante.nome_completo} ↔ {self.destinatario.nome_completo} ({self.status})"
     
     def aceitar_troca(self):
-        if self.status != 'PENDENTE':
+        if self.status != self.Status.PENDENTE:
             raise ValueError('Apenas trocas pendentes podem ser aceitas')
         
-        # Para sábados (dupla), troca apenas o técnico principal
-        temp_principal = self.plantao_solicitante.tecnico_principal
-        self.plantao_solicitante.tecnico_principal = self.plantao_destinatario.tecnico_principal
-        self.plantao_destinatario.tecnico_principal = temp_principal
-        
-        self.plantao_solicitante.save()
-        self.plantao_destinatario.save()
-        
-        self.status = 'ACEITA'
-        self.respondido_em = timezone.now()
-        self.save()
+        with transaction.atomic():
+            # Para sábados (dupla), troca apenas o técnico principal
+            solicitante, destinatario = self.plantao_solicitante, self.plantao_destinatario
+            solicitante.tecnico_principal_id, destinatario.tecnico_principal_id = (
+                destinatario.tecnico_principal_id, solicitante.tecnico_principal_id
+            )
+            
+            self.plantao_solicitante.save(update_fields=['tecnico_principal', 'atualizado_em'])
+            self.plantao_destinatario.save(update_fields=['tecnico_principal', 'atualizado_em'])
+            
+            self.status = self.Status.ACEITA
+            self.respondido_em = timezone.now()
+            self.save(update_fields=['status', 'respondido_em'])
     
     def recusar_troca(self):
-        if self.status != 'PENDENTE':
+        if self.status != self.Status.PENDENTE:
             raise ValueError('Apenas trocas pendentes podem ser recusadas')
         
-        self.status = 'RECUSADA'
+        self.status = self.Status.RECUSADA
         self.respondido_em = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'respondido_em'])
     
     def cancelar_troca(self):
-        if self.status != 'PENDENTE':
+        if self.status != self.Status.PENDENTE:
             raise ValueError('Apenas trocas pendentes podem ser canceladas')
         
-        self.status = 'CANCELADA'
+        self.status = self.Status.CANCELADA
         self.respondido_em = timezone.now()
-        self.save()
+        self.save(update_fields=['status', 'respondido_em'])
 
 
 class EscalaAutomaticaTecnico(models.Model):
@@ -432,7 +565,7 @@ class EscalaAutomaticaTecnico(models.Model):
     data_inicio = models.DateField(help_text="Data do primeiro sábado")
     semanas_gerar = models.IntegerField(default=4)
     
-    criada_em = models.DateTimeField(auto_now_add=True)
+    criada_em = models.DateTimeField(db_default=Now(), editable=False)
     
     class Meta:
         verbose_name = "Escala Automática - Técnico"
@@ -441,8 +574,3 @@ class EscalaAutomaticaTecnico(models.Model):
     
     def __str__(self):
         return f"Escala Técnicos - {self.data_inicio} ({self.semanas_gerar} semanas)"
-
-
-# Adicione este import no topo do arquivo se não tiver
-from django.utils import timezone
-from datetime import datetime
\ No newline at end of file
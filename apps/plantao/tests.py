@@ -1,3 +1,274 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from reportlab import rl_config
+
+from .forms import FiltroPlantaoForm
+from .models import Colaborador, Plantao, PlantaoTecnico, TecnicoCampo
+
+
+class DashboardPaginacaoTests(TestCase):
+    """Dashboard SAC pagina por semanas inteiras; sem filtros fica na janela padrão de 8 semanas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@teste.com', 'senha')
+        colaborador = Colaborador.objects.create(nome_completo='Fulano')
+
+        hoje = timezone.localdate()
+        cls.inicio_janela = hoje - timedelta(days=hoje.weekday())
+        cls.fim_janela = cls.inicio_janela + timedelta(weeks=8) - timedelta(days=1)
+
+        turnos = list(Plantao.Turno)
+        plantoes = [
+            # 60 dentro da janela (as 8 semanas)
+            Plantao.build(colaborador, cls.inicio_janela + timedelta(days=i % 56), turnos[i // 56])
+            for i in range(60)
+        ] + [
+            # 100 no passado, que só aparecem com filtro de data
+            Plantao.build(colaborador, cls.inicio_janela - timedelta(days=1 + i % 90), turnos[i // 90])
+            for i in range(100)
+        ]
+        Plantao.objects.bulk_create(plantoes)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _paginas(self, params):
+        """Percorre todas as páginas, devolvendo (total_plantoes, {semana: nº de plantões}) de cada uma"""
+        paginas, numero = [], 1
+        while True:
+            response = self.client.get(reverse('dashboard'), {**params, 'page': numero})
+            semanas = {
+                chave: len(semana['plantoes'])
+                for chave, semana in response.context['plantoes_agrupados'].items()
+            }
+            paginas.append((response.context['total_plantoes'], semanas))
+            if not response.context['page_obj'].has_next():
+                return paginas
+            numero += 1
+
+    def test_sem_filtros_a_janela_padrao_cabe_numa_pagina(self):
+        response = self.client.get(reverse('dashboard'), {'page': 2})
+
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.num_pages, 1)
+        self.assertEqual(response.context['total_plantoes'], 60)
+        plantoes = [p for semana in response.context['plantoes_agrupados'].values() for p in semana['plantoes']]
+        self.assertEqual(len(plantoes), 60)
+        for plantao in plantoes:
+            self.assertGreaterEqual(plantao.data, self.inicio_janela)
+            self.assertLessEqual(plantao.data, self.fim_janela)
+
+    def test_filtro_de_data_pagina_sem_dividir_semanas(self):
+        params = {'data_inicio': (self.inicio_janela - timedelta(days=90)).isoformat()}
+
+        paginas = self._paginas(params)
+
+        self.assertGreater(len(paginas), 1)
+        chaves = [chave for _total, semanas in paginas for chave in semanas]
+        self.assertEqual(len(chaves), len(set(chaves)))
+        self.assertEqual(sum(n for _total, semanas in paginas for n in semanas.values()), 160)
+        for total, _semanas in paginas:
+            self.assertEqual(total, 160)
+
+
+class ColaboradorAtivoChoiceFieldTests(TestCase):
+    """Opções exibidas pelo select de colaboradores batem com o que a validação aceita"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Colaborador.objects.create(nome_completo='Ana', ordem_fila=1)
+        cls.bia = Colaborador.objects.create(nome_completo='Bia', ordem_fila=2)
+        Colaborador.objects.create(nome_completo='Inativo', ordem_fila=3, ativo=False)
+
+    def _opcoes(self, form):
+        return [str(label) for _valor, label in form.fields['colaborador'].choices]
+
+    def test_lista_padrao_mostra_os_ativos(self):
+        self.assertEqual(self._opcoes(FiltroPlantaoForm()), ['Todos', 'Ana', 'Bia'])
+
+    def test_colaborador_desativado_sai_da_lista_no_form_seguinte(self):
+        self.assertEqual(self._opcoes(FiltroPlantaoForm()), ['Todos', 'Ana', 'Bia'])
+
+        Colaborador.objects.filter(pk=self.bia.pk).update(ativo=False)
+
+        self.assertEqual(self._opcoes(FiltroPlantaoForm()), ['Todos', 'Ana'])
+
+    def test_queryset_restringido_restringe_as_opcoes(self):
+        form = FiltroPlantaoForm({'colaborador': self.bia.pk})
+        form.fields['colaborador'].queryset = Colaborador.objects.filter(pk=self.ana.pk)
+
+        self.assertEqual(self._opcoes(form), ['Todos', 'Ana'])
+        self.assertFalse(form.is_valid())
+
+    def test_queryset_de_ativos_atribuido_segue_o_queryset(self):
+        # Mesmos ativos, outra ordenação: fora do padrão, as opções vêm do queryset
+        form = FiltroPlantaoForm()
+        form.fields['colaborador'].queryset = Colaborador.objects.filter(ativo=True).order_by('-nome_completo')
+
+        self.assertEqual(self._opcoes(form), ['Todos', 'Bia', 'Ana'])
+
+
+class ExportarPdfTecnicosCacheTests(TestCase):
+    """PDF de técnicos em cache + ETag: 304 enquanto nada muda, PDF novo quando muda"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Sem compressão o texto das células aparece literal no PDF
+        cls._page_compression = rl_config.pageCompression
+        rl_config.pageCompression = 0
+
+    @classmethod
+    def tearDownClass(cls):
+        rl_config.pageCompression = cls._page_compression
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@teste.com', 'senha')
+        cls.joao = TecnicoCampo.objects.create(nome_completo='Joao', ordem_fila=1)
+        cls.pedro = TecnicoCampo.objects.create(nome_completo='Pedro', ordem_fila=2)
+        hoje = timezone.localdate()
+        cls.sabado = PlantaoTecnico.objects.create(
+            tecnico_principal=cls.joao, tecnico_dupla=cls.pedro,
+            data=hoje + timedelta(days=1), tipo='SABADO_DUPLA', observacoes='ObsSabado',
+        )
+        cls.domingo = PlantaoTecnico.objects.create(
+            tecnico_principal=cls.pedro, data=hoje + timedelta(days=2), tipo='DOMINGO_SOLO',
+            observacoes='ObsDomingo',
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.url = reverse('exportar_pdf_tecnicos')
+
+    def _primeiro_download(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def _revalidar(self, etag):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_primeiro_download_tem_etag(self):
+        response = self._primeiro_download()
+
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertIn(b'ObsSabado', response.content)
+
+    def test_if_none_match_sem_mudanca_responde_304(self):
+        etag = self._primeiro_download()['ETag']
+
+        response = self._revalidar(etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_editar_plantao_gera_pdf_novo(self):
+        etag = self._primeiro_download()['ETag']
+
+        self.sabado.observacoes = 'ObsEditada'
+        self.sabado.save()
+        response = self._revalidar(etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn(b'ObsEditada', response.content)
+        self.assertNotIn(b'ObsSabado', response.content)
+
+    def test_excluir_plantao_gera_pdf_novo(self):
+        etag = self._primeiro_download()['ETag']
+
+        self.domingo.delete()
+        response = self._revalidar(etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertNotIn(b'ObsDomingo', response.content)
+
+    def test_renomear_tecnico_gera_pdf_novo(self):
+        etag = self._primeiro_download()['ETag']
+
+        self.pedro.nome_completo = 'Renomeado'
+        self.pedro.save()
+        response = self._revalidar(etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn(b'Renomeado', response.content)
+
+    def test_excluir_tecnico_gera_pdf_novo(self):
+        etag = self._primeiro_download()['ETag']
+
+        # Plantões do técnico vão junto (CASCADE); o do outro técnico continua
+        self.joao.delete()
+        response = self._revalidar(etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertNotIn(b'ObsSabado', response.content)
+        self.assertIn(b'ObsDomingo', response.content)
+
+
+class PlantaoSaveTests(TestCase):
+    """save() só recalcula horário e dia da semana quando turno ou data mudaram"""
+
+    @classmethod
+    def setUpTestData(cls):
+        colaborador = Colaborador.objects.create(nome_completo='Fulano')
+        # 2030-01-05 é sábado
+        cls.plantao = Plantao.objects.create(
+            colaborador=colaborador, data=date(2030, 1, 5), turno='SABADO_TARDE1',
+        )
+
+    def test_criacao_preenche_horario_e_dia(self):
+        plantao = Plantao.objects.get(pk=self.plantao.pk)
+
+        self.assertEqual((plantao.hora_inicio, plantao.hora_fim), (time(13, 0), time(17, 0)))
+        self.assertEqual(plantao.dia_semana, 'SAB')
+
+    def test_mudar_turno_e_data_recalcula_horario_e_dia(self):
+        plantao = Plantao.objects.get(pk=self.plantao.pk)
+
+        plantao.turno = 'DOMINGO_MANHA'
+        plantao.data = date(2030, 1, 6)
+        plantao.save()
+
+        plantao.refresh_from_db()
+        self.assertEqual((plantao.hora_inicio, plantao.hora_fim), (time(8, 0), time(13, 0)))
+        self.assertEqual(plantao.dia_semana, 'DOM')
+
+    def test_mudar_so_turno_recalcula_so_horario(self):
+        plantao = Plantao.objects.get(pk=self.plantao.pk)
+
+        plantao.turno = 'SABADO_TARDE2'
+        plantao.save()
+
+        plantao.refresh_from_db()
+        self.assertEqual((plantao.hora_inicio, plantao.hora_fim), (time(17, 0), time(21, 0)))
+        self.assertEqual(plantao.dia_semana, 'SAB')
+
+    def test_save_sem_mudar_turno_nem_data_nao_mexe_em_horario_e_dia(self):
+        # Horário e dia ajustados direto no banco, fora do que o turno/data dariam
+        Plantao.objects.filter(pk=self.plantao.pk).update(
+            hora_inicio=time(14, 0), hora_fim=time(18, 0), dia_semana='SEX',
+        )
+        plantao = Plantao.objects.get(pk=self.plantao.pk)
+
+        plantao.observacoes = 'Só a observação mudou'
+        plantao.save()
 
-# Create your tests here.
+        plantao.refresh_from_db()
+        self.assertEqual(plantao.observacoes, 'Só a observação mudou')
+        self.assertEqual((plantao.hora_inicio, plantao.hora_fim), (time(14, 0), time(18, 0)))
+        self.assertEqual(plantao.dia_semana, 'SEX')
@@ -0,0 +1,90 @@
+from django.contrib.auth.models import User
+
+from .models import Colaborador, TecnicoCampo
+
+
+# ========== FUNÇÕES AUXILIARES DE TIPO DE USUÁRIO ==========
+
+def get_user_type(user):
+    """
+    Identifica o tipo de usuário baseado no model vinculado
+    Retorna: 'admin', 'tecnico', 'colaborador' ou None
+    """
+    if not user.is_authenticated:
+        return None
+    
+    user_type = getattr(user, '_cached_user_type', Ellipsis)
+    if user_type is Ellipsis:
+        user_type = user._cached_user_type = _resolver_user_type(user)
+    return user_type
+
+
+def _resolver_user_type(user):
+    # Admin sempre é admin
+    if is_admin(user):
+        return 'admin'
+    
+    # Uma única query traz os dois vínculos reversos; com select_related, hasattr
+    # não vai ao banco quando o vínculo não existe
+    perfil = User.objects.select_related('tecnico', 'colaborador').get(pk=user.pk)
+    user._cached_colaborador = getattr(perfil, 'colaborador', None)
+    user._cached_tecnico = getattr(perfil, 'tecnico', None)
+    
+    # Verificar TecnicoCampo (DEVE VIR PRIMEIRO!)
+    if user._cached_tecnico is not None:
+        return 'tecnico'
+    
+    # Verificar Colaborador SAC
+    if user._cached_colaborador is not None:
+        return 'colaborador'
+    
+    return None
+
+
+# ========== FUNÇÕES AUXILIARES DE PERMISSÃO (MANTIDAS PARA COMPATIBILIDADE) ==========
+
+def get_user_groups(user):
+    """Nomes dos grupos do usuário, buscados numa única query e guardados no próprio objeto (vive só durante o request)"""
+    # De propósito fora do cache entre requests: decide permissão de admin, e o cache
+    # padrão (LocMem) é por processo, então invalidar num worker não alcança os outros
+    if not hasattr(user, '_group_names'):
+        user._group_names = set(user.groups.values_list('name', flat=True))
+    return user._group_names
+
+
+def is_admin(user):
+    """Verifica se o usuário é administrador"""
+    return user.is_superuser or 'Administrador' in get_user_groups(user)
+
+
+def is_colaborador(user):
+    """Verifica se o usuário pertence ao grupo Colaborador"""
+    return 'Colaborador' in get_user_groups(user)
+
+
+def get_user_colaborador(user):
+    """Retorna o objeto Colaborador SAC vinculado ao usuário (memoizado no user)"""
+    colaborador = getattr(user, '_cached_colaborador', Ellipsis)
+    if colaborador is Ellipsis:
+        colaborador = Colaborador.objects.filter(user=user).first()
+        user._cached_colaborador = colaborador
+    return colaborador
+
+
+def get_user_tecnico(user):
+    """Retorna o TecnicoCampo vinculado ao usuário (memoizado no user)"""
+    tecnico = getattr(user, '_cached_tecnico', Ellipsis)
+    if tecnico is Ellipsis:
+        tecnico = TecnicoCampo.objects.filter(user=user).first()
+        user._cached_tecnico = tecnico
+    return tecnico
+
+
+def is_tecnico(user):
+    """Verifica se é técnico de campo"""
+    return get_user_type(user) == 'tecnico'
+
+
+def is_colaborador_sac(user):
+    """Verifica se é colaborador SAC"""
+    return get_user_type(user) == 'colaborador'
@@ -1,10 +1,19 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
-from django.db.models import Q
-from datetime import datetime, timedelta
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max, Q
+from django.db.models.functions import Left
+from datetime import date, datetime, timedelta
+import hashlib
+from functools import lru_cache, wraps
+from itertools import cycle, groupby, islice
 from .models import Plantao, Colaborador, EscalaAutomatica, TrocaPlantao, Notificacao
 from .forms import PlantaoForm, ColaboradorForm, EscalaAutomaticaForm, FiltroPlantaoForm
+from .utils import get_user_colaborador, get_user_tecnico
 from django.http import HttpResponse
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
@@ -12,72 +21,75 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm, inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
-from io import BytesIO
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
 
 
-# ========== FUNÇÕES AUXILIARES DE TIPO DE USUÁRIO ==========
+# ========== DECORATOR CUSTOMIZADO ==========
 
-def get_user_type(user):
-    """
-    Identifica o tipo de usuário baseado no model vinculado
-    Retorna: 'admin', 'tecnico', 'colaborador' ou None
-    """
-    if not user.is_authenticated:
-        return None
-    
-    # Admin sempre é admin
-    if user.groups.filter(name='Administrador').exists() or user.is_superuser:
-        return 'admin'
-    
-    # Verificar TecnicoCampo (DEVE VIR PRIMEIRO!)
-    try:
-        from .models import TecnicoCampo
-        if hasattr(user, 'tecnico') and user.tecnico is not None:
-            return 'tecnico'
-    except:
-        pass
-    
-    # Verificar Colaborador SAC
-    try:
-        if hasattr(user, 'colaborador') and user.colaborador is not None:
-            return 'colaborador'
-    except:
-        pass
-    
-    return None
+def admin_required(view_func):
+    """Decorator que permite apenas administradores (já inclui o login_required)"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if request.user_type != 'admin':
+            messages.error(request, '🔒 Você não tem permissão para acessar esta página.')
+            return redirect('dashboard')
+        return view_func(request, *args, **kwargs)
+    return wrapper
 
 
-# ========== FUNÇÕES AUXILIARES DE PERMISSÃO (MANTIDAS PARA COMPATIBILIDADE) ==========
+# ========== AGRUPAMENTO POR SEMANA ==========
 
-def is_admin(user):
-    """Verifica se o usuário é administrador"""
-    return user.groups.filter(name='Administrador').exists() or user.is_superuser
+@lru_cache(maxsize=512)
+def _semana_info(ordinal):
+    """(início, fim, chave) da semana de segunda a domingo que contém a data date.fromordinal(ordinal)"""
+    dia = date.fromordinal(ordinal)
+    inicio = dia - timedelta(days=dia.weekday())
+    return inicio, inicio + timedelta(days=6), inicio.isoformat()
 
 
-def is_colaborador(user):
-    """Verifica se o usuário pertence ao grupo Colaborador"""
-    return user.groups.filter(name='Colaborador').exists()
+def _segunda_feira(plantao):
+    return plantao.data.toordinal() - plantao.data.weekday()
 
 
-def get_user_colaborador(user):
-    """Retorna o objeto Colaborador SAC vinculado ao usuário"""
-    try:
-        return Colaborador.objects.get(user=user)
-    except Colaborador.DoesNotExist:
-        return None
+def _iter_semanas(plantoes):
+    """
+    Agrupa plantões já ordenados por data em semanas de segunda a domingo.
+    Gera (início, fim, chave, plantões da semana) numa só passada, sem reordenar.
+    """
+    for ordinal, grupo in groupby(plantoes, key=_segunda_feira):
+        inicio, fim, chave = _semana_info(ordinal)
+        yield inicio, fim, chave, list(grupo)
 
 
-# ========== DECORATOR CUSTOMIZADO ==========
+def _paginar_por_semana(plantoes, pagina):
+    """
+    Pagina por semanas inteiras: uma semana nunca fica dividida entre duas páginas.
+    Uma consulta agregada (plantões por dia) dá as semanas e o total, sem COUNT(*) à
+    parte; a segunda traz só os plantões das semanas da página.
+    Retorna (page_obj, plantões da página ordenados por data, total de plantões).
+    """
+    por_semana = {}
+    for dia, total in plantoes.order_by().values_list('data').annotate(total=Count('id')):
+        inicio = dia - timedelta(days=dia.weekday())
+        por_semana[inicio] = por_semana.get(inicio, 0) + total
+    
+    page_obj = Paginator(sorted(por_semana), _SEMANAS_POR_PAGINA).get_page(pagina)
+    if not page_obj.object_list:
+        return page_obj, plantoes.none(), 0
+    
+    inicio, fim = page_obj.object_list[0], page_obj.object_list[-1] + timedelta(days=6)
+    plantoes_pagina = plantoes.filter(data__range=(inicio, fim)).order_by('data', 'hora_inicio')
+    return page_obj, plantoes_pagina, sum(por_semana.values())
 
-def admin_required(view_func):
-    """Decorator que permite apenas administradores"""
-    def wrapper(request, *args, **kwargs):
-        if not is_admin(request.user):
-            messages.error(request, '🔒 Você não tem permissão para acessar esta página.')
-            return redirect('dashboard')
-        return view_func(request, *args, **kwargs)
-    return wrapper
+
+# Listas longas (dashboard, plantões disponíveis para troca, técnicos) são paginadas.
+# O dashboard pagina por semana: 8 semanas, o tamanho da janela padrão, cabem numa página
+_SEMANAS_POR_PAGINA = 8
+_PLANTOES_POR_PAGINA = 50
+_TECNICOS_POR_PAGINA = 50
 
 
 # ========== VIEWS SAC ==========
@@ -86,29 +98,36 @@ def admin_required(view_func):
 def dashboard(request):
     """Dashboard SAC - redireciona técnicos"""
     
-    user_type = get_user_type(request.user)
+    user_type = request.user_type
+    admin_flag = user_type == 'admin'
     
     # 🔴 CRÍTICO: Se for técnico, redireciona para dashboard de técnicos
     if user_type == 'tecnico':
         messages.warning(request, '⚠️ Você é um técnico de campo.')
         return redirect('dashboard_tecnicos')
     
-    # Filtros
-    filtro_form = FiltroPlantaoForm(request.GET or None)
+    # Filtros: o form só é vinculado quando a URL traz algum campo dele. O ?page= da
+    # paginação sozinho não pode tirar o dashboard da janela padrão de 8 semanas
+    tem_filtro = any(campo in request.GET for campo in FiltroPlantaoForm.base_fields)
+    filtro_form = FiltroPlantaoForm(request.GET if tem_filtro else None)
     
-    # Query base
-    plantoes = Plantao.objects.select_related('colaborador').all()
+    # Query base: colaborador SAC (não admin) vê APENAS seus plantões; só as colunas
+    # que o template usa (inclusive do colaborador)
+    plantoes = Plantao.objects.para_usuario(request.user).select_related('colaborador').only(
+        'id', 'data', 'dia_semana', 'turno', 'hora_inicio', 'hora_fim', 'observacoes',
+        'colaborador__id', 'colaborador__nome_completo',
+    )
     
-    # Buscar colaborador do usuário logado
-    colaborador_user = get_user_colaborador(request.user)
+    if admin_flag:
+        # Admin vê todos os plantões, sem filtro, e o template não usa colaborador_logado
+        # para ele (mostra editar/excluir no lugar de "Trocar")
+        colaborador_user = None
+    else:
+        # Buscar colaborador do usuário logado
+        colaborador_user = get_user_colaborador(request.user)
     
-    # Se for colaborador SAC (não admin), mostra APENAS seus plantões
-    if user_type == 'colaborador':
-        if colaborador_user:
-            plantoes = plantoes.filter(colaborador=colaborador_user)
-        else:
-            plantoes = Plantao.objects.none()
-            messages.info(request, 'ℹ️ Você ainda não está vinculado a um colaborador.')
+    if user_type == 'colaborador' and not colaborador_user:
+        messages.info(request, 'ℹ️ Você ainda não está vinculado a um colaborador.')
     
     # Aplicar filtros se o form for válido
     if filtro_form.is_valid():
@@ -123,42 +142,38 @@ def dashboard(request):
             plantoes = plantoes.filter(data__lte=data_fim)
         
         # Apenas administradores podem filtrar por colaborador
-        if is_admin(request.user) and colaborador_filtro:
+        if admin_flag and colaborador_filtro:
             plantoes = plantoes.filter(colaborador=colaborador_filtro)
             
         if dia_semana:
             plantoes = plantoes.filter(dia_semana=dia_semana)
     else:
-        hoje = datetime.now().date()
+        hoje = request.hoje
         inicio_semana_atual = hoje - timedelta(days=hoje.weekday())  # ← Calcula segunda-feira
         data_fim = inicio_semana_atual + timedelta(weeks=8) - timedelta(days=1)  # ← 8 semanas completas
-        plantoes = plantoes.filter(data__gte=inicio_semana_atual, data__lte=data_fim)
+        plantoes = plantoes.filter(data__range=(inicio_semana_atual, data_fim))
     
-    # Agrupar plantões por semana
+    # Paginar por semanas inteiras e agrupar só a página atual: o banco já devolve
+    # ordenado por data, então basta uma passada
+    page_obj, plantoes_pagina, total_plantoes = _paginar_por_semana(plantoes, request.GET.get('page'))
     plantoes_agrupados = {}
-    for plantao in plantoes:
-        inicio_semana = plantao.data - timedelta(days=plantao.data.weekday())
-        semana_key = inicio_semana.strftime('%Y-%m-%d')
-        
-        if semana_key not in plantoes_agrupados:
-            plantoes_agrupados[semana_key] = {
-                'inicio': inicio_semana,
-                'fim': inicio_semana + timedelta(days=6),
-                'plantoes': []
-            }
-        plantoes_agrupados[semana_key]['plantoes'].append(plantao)
-    
-    plantoes_agrupados = dict(sorted(plantoes_agrupados.items()))
+    for inicio_semana, fim_semana, semana_key, plantoes_semana in _iter_semanas(plantoes_pagina):
+        plantoes_agrupados[semana_key] = {
+            'inicio': inicio_semana,
+            'fim': fim_semana,
+            'plantoes': plantoes_semana,
+        }
     
-    # Contar colaboradores ativos
-    colaboradores_count = Colaborador.objects.filter(ativo=True).count()
+    # Contar colaboradores ativos pela mesma lista que alimenta o select do filtro
+    colaboradores_count = len(filtro_form.fields['colaborador'].colaboradores())
     
     context = {
         'plantoes_agrupados': plantoes_agrupados,
+        'page_obj': page_obj,
         'filtro_form': filtro_form,
-        'total_plantoes': plantoes.count(),
+        'total_plantoes': total_plantoes,
         'colaboradores_count': colaboradores_count,
-        'is_admin': is_admin(request.user),
+        'is_admin': admin_flag,
         'is_colaborador': user_type == 'colaborador',
         'colaborador_logado': colaborador_user,
         'user_type': user_type,
@@ -167,7 +182,6 @@ def dashboard(request):
     return render(request, 'dashboard/home.html', context)
 
 
-@login_required
 @admin_required
 def cadastrar_plantao(request):
     """Cadastro manual de plantão - APENAS ADMIN"""
@@ -194,7 +208,6 @@ def cadastrar_plantao(request):
     return render(request, 'dashboard/cadastrar_plantao.html', context)
 
 
-@login_required
 @admin_required
 def editar_plantao(request, plantao_id):
     """Editar plantão existente - APENAS ADMIN"""
@@ -222,12 +235,11 @@ def editar_plantao(request, plantao_id):
     return render(request, 'dashboard/cadastrar_plantao.html', context)
 
 
-@login_required
 @admin_required
 def deletar_plantao(request, plantao_id):
     """Deletar plantão - APENAS ADMIN"""
     
-    plantao = get_object_or_404(Plantao, id=plantao_id)
+    plantao = get_object_or_404(Plantao.objects.select_related('colaborador'), id=plantao_id)
     
     if request.method == 'POST':
         colaborador_nome = plantao.colaborador.nome_completo
@@ -242,7 +254,6 @@ def deletar_plantao(request, plantao_id):
     return render(request, 'dashboard/confirmar_delete.html', context)
 
 
-@login_required
 @admin_required
 def gerar_escala_automatica(request):
     """Gera escala automática - APENAS ADMIN"""
@@ -250,15 +261,17 @@ def gerar_escala_automatica(request):
     if request.method == 'POST':
         form = EscalaAutomaticaForm(request.POST)
         if form.is_valid():
-            escala = form.save(commit=False)
-            escala.criada_por = request.user
-            escala.save()
-            
             try:
-                plantoes_criados = _criar_plantoes_automaticos(
-                    escala.data_inicio,
-                    escala.semanas_gerar
-                )
+                # Escala e plantões numa única transação: em caso de erro nada fica gravado
+                with transaction.atomic():
+                    escala = form.save(commit=False)
+                    escala.criada_por = request.user
+                    escala.save()
+                    
+                    plantoes_criados = _criar_plantoes_automaticos(
+                        escala.data_inicio,
+                        escala.semanas_gerar
+                    )
                 messages.success(
                     request, 
                     f'✅ Escala gerada com sucesso! {plantoes_criados} plantões criados.'
@@ -266,9 +279,8 @@ def gerar_escala_automatica(request):
                 return redirect('dashboard')
             except Exception as e:
                 messages.error(request, f'❌ Erro ao gerar escala: {str(e)}')
-                escala.delete()
     else:
-        hoje = datetime.now().date()
+        hoje = request.hoje
         dias_ate_sabado = (5 - hoje.weekday()) % 7
         if dias_ate_sabado == 0:
             dias_ate_sabado = 7
@@ -284,43 +296,62 @@ def gerar_escala_automatica(request):
     return render(request, 'dashboard/gerar_escala.html', context)
 
 
+# Modelo de uma semana da escala SAC: (dias após o sábado, posição na fila a partir
+# do início da semana, turno). Sábado tarde e domingo tarde 1 ficam com a mesma pessoa,
+# sábado noite e domingo manhã com a seguinte, e domingo tarde 2 com a terceira.
+_MODELO_SEMANA_SAC = (
+    (0, 0, 'SABADO_TARDE1'),
+    (0, 1, 'SABADO_TARDE2'),
+    (1, 1, 'DOMINGO_MANHA'),
+    (1, 0, 'DOMINGO_TARDE1'),
+    (1, 2, 'DOMINGO_TARDE2'),
+)
+
+
 def _criar_plantoes_automaticos(data_inicio, semanas):
     """Lógica para criar plantões automaticamente seguindo a regra da fila"""
     
-    colaboradores = list(Colaborador.objects.filter(ativo=True).order_by('ordem_fila'))
+    colaboradores = list(
+        Colaborador.objects.filter(ativo=True).only('id', 'ordem_fila', 'nome_completo').order_by('ordem_fila')
+    )
     
     if len(colaboradores) < 2:
         raise ValueError('É necessário ter pelo menos 2 colaboradores ativos!')
     
-    plantoes_criados = 0
-    indice_fila = 0
-    
-    for semana in range(semanas):
-        sabado = data_inicio + timedelta(weeks=semana)
-        domingo = sabado + timedelta(days=1)
-        
-        colab_sabado_tarde = colaboradores[indice_fila % len(colaboradores)]
-        colab_sabado_noite = colaboradores[(indice_fila + 1) % len(colaboradores)]
-        colab_domingo_noite = colaboradores[(indice_fila + 2) % len(colaboradores)]
-        
-        Plantao.objects.create(colaborador=colab_sabado_tarde, data=sabado, turno='SABADO_TARDE1')
-        Plantao.objects.create(colaborador=colab_sabado_noite, data=sabado, turno='SABADO_TARDE2')
-        Plantao.objects.create(colaborador=colab_sabado_noite, data=domingo, turno='DOMINGO_MANHA')
-        Plantao.objects.create(colaborador=colab_sabado_tarde, data=domingo, turno='DOMINGO_TARDE1')
-        Plantao.objects.create(colaborador=colab_domingo_noite, data=domingo, turno='DOMINGO_TARDE2')
-        
-        plantoes_criados += 5
-        indice_fila += 2
-    
-    return plantoes_criados
+    # Fila já "desenrolada": a semana N usa as posições 2N, 2N+1 e 2N+2
+    fila = list(islice(cycle(colaboradores), 2 * semanas + 1))
+    
+    # Produto semanas × modelo da semana, calculado de uma vez
+    plantoes = [
+        Plantao.build(fila[2 * semana + pos_fila], data_inicio + timedelta(days=7 * semana + dia), turno)
+        for semana in range(semanas)
+        for dia, pos_fila, turno in _MODELO_SEMANA_SAC
+    ]
+    
+    # Turnos já ocupados no período são mantidos: gerar de novo sobre a mesma data
+    # só preenche o que falta
+    periodo = (data_inicio, data_inicio + timedelta(weeks=semanas) - timedelta(days=1))
+    ocupados = set(Plantao.objects.filter(data__range=periodo).values_list('data', 'turno'))
+    plantoes = [p for p in plantoes if (p.data, p.turno) not in ocupados]
+    
+    # Um INSERT por lote em vez de um por plantão (bulk_create não chama save());
+    # ignore_conflicts cobre um turno ocupado entre a checagem acima e o INSERT
+    Plantao.objects.bulk_create(plantoes, batch_size=500, ignore_conflicts=True)
+    
+    # ignore_conflicts não diz quais linhas entraram: conta os plantões que ficaram no
+    # banco com o colaborador desta geração, e não os que tentamos inserir
+    gravados = set(
+        Plantao.objects.filter(data__range=periodo).values_list('data', 'turno', 'colaborador_id')
+    )
+    return sum((p.data, p.turno, p.colaborador_id) in gravados for p in plantoes)
 
 
-@login_required
 @admin_required
 def gerenciar_colaboradores(request):
     """Listar e gerenciar colaboradores - APENAS ADMIN"""
     
-    colaboradores = Colaborador.objects.all().order_by('ordem_fila')
+    # O template mostra o username de cada colaborador: um JOIN em vez de uma query por linha
+    colaboradores = Colaborador.objects.select_related('user').order_by('ordem_fila')
     
     context = {
         'colaboradores': colaboradores,
@@ -329,7 +360,6 @@ def gerenciar_colaboradores(request):
     return render(request, 'dashboard/colaboradores.html', context)
 
 
-@login_required
 @admin_required
 def cadastrar_colaborador(request):
     """Cadastrar novo colaborador - APENAS ADMIN"""
@@ -341,7 +371,8 @@ def cadastrar_colaborador(request):
             messages.success(request, f'✅ Colaborador {colaborador.nome_completo} cadastrado com sucesso!')
             return redirect('gerenciar_colaboradores')
     else:
-        ultima_ordem = Colaborador.objects.count()
+        # Próxima posição depois do último da fila (MAX pelo índice, sem COUNT(*))
+        ultima_ordem = Colaborador.objects.aggregate(m=Max('ordem_fila'))['m'] or 0
         form = ColaboradorForm(initial={'ordem_fila': ultima_ordem + 1, 'ativo': True})
     
     context = {
@@ -352,7 +383,6 @@ def cadastrar_colaborador(request):
     return render(request, 'dashboard/cadastrar_colaborador.html', context)
 
 
-@login_required
 @admin_required
 def editar_colaborador(request, colaborador_id):
     """Editar colaborador existente - APENAS ADMIN"""
@@ -379,6 +409,137 @@ def editar_colaborador(request, colaborador_id):
 
 # ========== EXPORTAR PDF SAC ==========
 
+# Estilos dos PDFs (SAC e técnicos), criados uma única vez na importação
+_PDF_COR        = colors.HexColor('#E94920')
+_PDF_COR_TEXTO  = colors.HexColor('#50443C')
+_PDF_COR_ZEBRA  = colors.HexColor('#fdf5f3')
+_PDF_COR_BORDA  = colors.HexColor('#e5e7eb')
+_PDF_COR_SEM_BG = colors.HexColor('#fff8f6')
+
+_PDF_ST_TD  = ParagraphStyle('td', fontName='Helvetica', fontSize=8, textColor=_PDF_COR_TEXTO, leading=11)
+_PDF_ST_TDC = ParagraphStyle('tdc', fontName='Helvetica', fontSize=8, textColor=_PDF_COR_TEXTO,
+                             leading=11, alignment=TA_CENTER)
+_PDF_ST_TITULO  = ParagraphStyle('ht', fontName='Helvetica-Bold', fontSize=13, textColor=colors.white,
+                                 alignment=TA_CENTER, leading=16)
+_PDF_ST_PERIODO = ParagraphStyle('sub', fontName='Helvetica', fontSize=8,
+                                 textColor=colors.HexColor('#9ca3af'), alignment=TA_CENTER, spaceAfter=14)
+_PDF_ST_VAZIO   = ParagraphStyle('vz', fontName='Helvetica', fontSize=10, textColor=colors.grey,
+                                 alignment=TA_CENTER)
+_PDF_ST_SEMANA  = ParagraphStyle('sl', fontName='Helvetica-Bold', fontSize=9, textColor=_PDF_COR, leading=12)
+
+_PDF_CABECALHO_STYLE = TableStyle([
+    ('BACKGROUND',    (0, 0), (-1, -1), _PDF_COR),
+    ('TOPPADDING',    (0, 0), (-1, -1), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 11),
+    ('LEFTPADDING',   (0, 0), (-1, -1), 14),
+    ('RIGHTPADDING',  (0, 0), (-1, -1), 14),
+])
+_PDF_SEMANA_STYLE = TableStyle([
+    ('BACKGROUND',    (0, 0), (-1, -1), _PDF_COR_SEM_BG),
+    ('TOPPADDING',    (0, 0), (-1, -1), 7),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 7),
+    ('LEFTPADDING',   (0, 0), (-1, -1), 10),
+    ('LINEBELOW',     (0, 0), (-1, -1), 1.2, _PDF_COR),
+])
+# Cabeçalho e células curtas (data, horário...) são strings simples, formatadas aqui
+# pelo TableStyle; só o que precisa quebrar linha ou tem marcação vira Paragraph
+_PDF_TABELA_STYLE = TableStyle([
+    ('BACKGROUND',    (0, 0), (-1, 0), _PDF_COR),
+    ('FONTNAME',      (0, 0), (-1, -1), 'Helvetica'),
+    ('FONTNAME',      (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE',      (0, 0), (-1, -1), 8),
+    ('TEXTCOLOR',     (0, 0), (-1, 0), colors.white),
+    ('TEXTCOLOR',     (0, 1), (-1, -1), _PDF_COR_TEXTO),
+    ('ALIGN',         (0, 0), (-1, 0), 'CENTER'),
+    ('ALIGN',         (0, 1), (3, -1), 'CENTER'),
+    ('TOPPADDING',    (0, 0), (-1, -1), 7),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 7),
+    ('LEFTPADDING',   (0, 0), (-1, -1), 8),
+    ('RIGHTPADDING',  (0, 0), (-1, -1), 8),
+    ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
+    ('LINEBELOW',     (0, 0), (-1, -1), 0.3, _PDF_COR_BORDA),
+    ('LINEAFTER',     (0, 0), (-1, -1), 0.3, _PDF_COR_BORDA),
+])
+
+# Colunas — portrait A4 (~18 cm útil)
+_PDF_COL_SAC      = [2.3*cm, 1.8*cm, 3.4*cm, 2.8*cm, 4.4*cm, 3.3*cm]
+_PDF_COL_TECNICOS = [2.1*cm, 1.6*cm, 2.5*cm, 2.8*cm, 5.3*cm, 3.7*cm]
+
+_PDF_TURNO_MAP = dict(Plantao.Turno.choices)
+_PDF_DIA_MAP   = dict(Plantao.DiaSemana.choices)
+_PDF_TIPO_MAP  = {'SABADO_DUPLA': 'Dupla', 'DOMINGO_SOLO': 'Solo', 'AVULSO_SOLO': 'Avulso'}
+_PDF_DIAS      = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
+
+# Coluna "Obs." é estreita: o banco já devolve só um caractere além do limite,
+# o suficiente para _pdf_obs saber se precisa da reticência
+_PDF_OBS_LIMITE = 38
+_PDF_OBS = Left('observacoes', _PDF_OBS_LIMITE + 1)
+
+# PDF pronto fica em cache por até 1h; a chave muda sozinha quando os dados mudam
+_PDF_CACHE_TTL = 60 * 60
+
+
+def _pdf_cabecalho(elements, titulo, largura, hoje, data_fim):
+    """Faixa de título e linha do período, comuns aos dois PDFs."""
+    hdr = Table([[Paragraph(f'<b>{titulo}</b>', _PDF_ST_TITULO)]], colWidths=[largura])
+    hdr.setStyle(_PDF_CABECALHO_STYLE)
+    elements.append(hdr)
+    elements.append(Spacer(1, 0.25 * cm))
+    elements.append(Paragraph(
+        f"Período: {hoje.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}",
+        _PDF_ST_PERIODO,
+    ))
+
+
+def _pdf_vazio(elements):
+    elements.append(Spacer(1, 1.5 * cm))
+    elements.append(Paragraph("Nenhum plantão encontrado para este período.", _PDF_ST_VAZIO))
+
+
+def _pdf_semana(elements, inicio, fim, largura, rows, col_widths):
+    """Faixa "Semana de ... a ..." seguida da tabela zebrada dos plantões."""
+    label = f"Semana de {inicio.strftime('%d/%m/%Y')} a {fim.strftime('%d/%m/%Y')}"
+    sem_t = Table([[Paragraph(f'<b>{label}</b>', _PDF_ST_SEMANA)]], colWidths=[largura])
+    sem_t.setStyle(_PDF_SEMANA_STYLE)
+    elements.append(sem_t)
+
+    t = Table(rows, colWidths=col_widths, repeatRows=1)
+    t.setStyle(_PDF_TABELA_STYLE)
+    t.setStyle([('BACKGROUND', (0, i), (-1, i), colors.white if i % 2 == 1 else _PDF_COR_ZEBRA)
+                for i in range(1, len(rows))])
+    elements.append(t)
+    elements.append(Spacer(1, 0.7 * cm))
+
+
+@lru_cache(maxsize=512)
+def _pdf_data(dia):
+    """Data (dd/mm/aaaa) e dia abreviado; vários plantões caem no mesmo dia, então formata uma vez só."""
+    return dia.strftime('%d/%m/%Y'), _PDF_DIAS[dia.weekday()]
+
+
+@lru_cache(maxsize=128)
+def _pdf_horario(inicio, fim):
+    """Faixa de horário; os turnos se repetem, então o texto sai do cache quase sempre."""
+    return f"{inicio.strftime('%H:%M')} – {fim.strftime('%H:%M')}"
+
+
+def _pdf_obs(observacoes, limite=_PDF_OBS_LIMITE):
+    """Observação abreviada para a coluna estreita do PDF."""
+    if not observacoes:
+        return '—'
+    return observacoes[:limite] + '…' if len(observacoes) > limite else observacoes
+
+
+def _pdf_versionado(response, etag):
+    """
+    Marca o PDF com a versão dos dados: o navegador guarda só para o próprio usuário
+    e revalida a cada download (If-None-Match), recebendo 304 se nada mudou.
+    """
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 def _pdf_rodape(canvas, doc):
     """Rodapé com número de página em todos os documentos PDF."""
     canvas.saveState()
@@ -390,7 +551,7 @@ def _pdf_rodape(canvas, doc):
     canvas.setFillColor(colors.HexColor('#9ca3af'))
     canvas.drawString(
         doc.leftMargin, y - 0.35 * cm,
-        f"Rapidin Plantões — gerado em {datetime.now().strftime('%d/%m/%Y às %H:%M')}"
+        f"Rapidin Plantões — gerado em {timezone.localtime().strftime('%d/%m/%Y às %H:%M')}"
     )
     canvas.drawRightString(
         doc.leftMargin + doc.width, y - 0.35 * cm,
@@ -403,15 +564,11 @@ def _pdf_rodape(canvas, doc):
 def exportar_pdf(request):
     """Exporta plantões SAC em PDF — portrait A4."""
 
-    COR          = colors.HexColor('#E94920')
-    COR_TEXTO    = colors.HexColor('#50443C')
-    COR_ZEBRA    = colors.HexColor('#fdf5f3')
-    COR_BORDA    = colors.HexColor('#e5e7eb')
-    COR_SEM_BG   = colors.HexColor('#fff8f6')
-
-    buffer = BytesIO()
+    # O HttpResponse é file-like: o ReportLab escreve direto no corpo, sem
+    # buffer intermediário nem a cópia de getvalue()
+    response = HttpResponse(content_type='application/pdf')
     doc = SimpleDocTemplate(
-        buffer,
+        response,
         pagesize=A4,
         rightMargin=1.5 * cm,
         leftMargin=1.5 * cm,
@@ -423,148 +580,55 @@ def exportar_pdf(request):
     W = doc.width
 
     # ── Dados ──────────────────────────────────────────────────────────────
-    hoje     = datetime.now().date()
+    hoje     = request.hoje
     data_fim = hoje + timedelta(weeks=4)
 
-    plantoes = (
-        Plantao.objects
-        .select_related('colaborador')
-        .filter(data__gte=hoje, data__lte=data_fim)
-        .order_by('data', 'hora_inicio')
-    )
+    plantoes = Plantao.objects.para_usuario(request.user).filter(data__gte=hoje, data__lte=data_fim)
 
-    user_type = get_user_type(request.user)
-    if user_type == 'colaborador':
+    if request.user_type == 'colaborador':
         colaborador = get_user_colaborador(request.user)
-        if colaborador:
-            plantoes = plantoes.filter(colaborador=colaborador)
-            titulo = f"Meus Plantões — {colaborador.nome_completo}"
-        else:
-            plantoes = Plantao.objects.none()
-            titulo   = "Meus Plantões"
+        titulo = f"Meus Plantões — {colaborador.nome_completo}" if colaborador else "Meus Plantões"
     else:
         titulo = "Escala de Plantões — SAC"
 
-    # ── Estilos ─────────────────────────────────────────────────────────────
-    def st(name, **kw):
-        defaults = dict(fontName='Helvetica', fontSize=9, textColor=COR_TEXTO, leading=12)
-        defaults.update(kw)
-        return ParagraphStyle(name, **defaults)
-
-    st_th  = st('th', fontName='Helvetica-Bold', fontSize=8,
-                textColor=colors.white, alignment=TA_CENTER, leading=11)
-    st_td  = st('td', fontSize=8, leading=11)
-    st_tdc = st('tdc', fontSize=8, leading=11, alignment=TA_CENTER)
-
     elements = []
 
     # ── Cabeçalho do documento ──────────────────────────────────────────────
-    hdr = Table(
-        [[Paragraph(f'<b>{titulo}</b>',
-                    ParagraphStyle('ht', fontName='Helvetica-Bold', fontSize=13,
-                                   textColor=colors.white, alignment=TA_CENTER, leading=16))]],
-        colWidths=[W],
+    _pdf_cabecalho(elements, titulo, W, hoje, data_fim)
+
+    # Leitura em lotes (iterator), ordenada por data e agrupada por semana: cada semana
+    # vira tabela e as tuplas são descartadas. Só as colunas impressas, em tuplas nomeadas.
+    semanas = _iter_semanas(
+        plantoes
+        .order_by('data', 'hora_inicio')
+        .annotate(obs=_PDF_OBS)
+        .values_list('data', 'dia_semana', 'turno', 'hora_inicio', 'hora_fim',
+                     'colaborador__nome_completo', 'obs', named=True)
+        .iterator(chunk_size=500)
     )
-    hdr.setStyle(TableStyle([
-        ('BACKGROUND',    (0, 0), (-1, -1), COR),
-        ('TOPPADDING',    (0, 0), (-1, -1), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 11),
-        ('LEFTPADDING',   (0, 0), (-1, -1), 14),
-        ('RIGHTPADDING',  (0, 0), (-1, -1), 14),
-    ]))
-    elements.append(hdr)
-    elements.append(Spacer(1, 0.25 * cm))
-    elements.append(Paragraph(
-        f"Período: {hoje.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}",
-        ParagraphStyle('sub', fontName='Helvetica', fontSize=8,
-                       textColor=colors.HexColor('#9ca3af'),
-                       alignment=TA_CENTER, spaceAfter=14),
-    ))
+
+    tem_plantoes = False
+    for ini, fim, _, plantoes_semana in semanas:
+        tem_plantoes = True
+        # Tabela de plantões
+        rows = [['Data', 'Dia', 'Turno', 'Horário', 'Colaborador', 'Observações']] + [
+            [
+                _pdf_data(p.data)[0],
+                Paragraph(_PDF_DIA_MAP.get(p.dia_semana, p.dia_semana),             _PDF_ST_TDC),
+                Paragraph(_PDF_TURNO_MAP.get(p.turno, p.turno),                     _PDF_ST_TD),
+                _pdf_horario(p.hora_inicio, p.hora_fim),
+                Paragraph(p.colaborador__nome_completo,                             _PDF_ST_TD),
+                Paragraph(_pdf_obs(p.obs),                                          _PDF_ST_TD),
+            ]
+            for p in plantoes_semana
+        ]
+        _pdf_semana(elements, ini, fim, W, rows, _PDF_COL_SAC)
 
     # ── Sem dados ───────────────────────────────────────────────────────────
-    if not plantoes.exists():
-        elements.append(Spacer(1, 1.5 * cm))
-        elements.append(Paragraph(
-            "Nenhum plantão encontrado para este período.",
-            ParagraphStyle('vz', fontName='Helvetica', fontSize=10,
-                           textColor=colors.grey, alignment=TA_CENTER),
-        ))
-    else:
-        # Agrupar por semana
-        semanas = {}
-        for p in plantoes:
-            ini = p.data - timedelta(days=p.data.weekday())
-            k   = ini.strftime('%Y-%m-%d')
-            if k not in semanas:
-                semanas[k] = {'inicio': ini, 'fim': ini + timedelta(days=6), 'plantoes': []}
-            semanas[k]['plantoes'].append(p)
-
-        # Colunas — portrait A4 (~18 cm útil)
-        COL = [2.3*cm, 1.8*cm, 3.4*cm, 2.8*cm, 4.4*cm, 3.3*cm]
-
-        for k in sorted(semanas):
-            sd = semanas[k]
-            label = f"Semana de {sd['inicio'].strftime('%d/%m/%Y')} a {sd['fim'].strftime('%d/%m/%Y')}"
-
-            # Faixa de semana
-            sem_t = Table(
-                [[Paragraph(f'<b>{label}</b>',
-                            ParagraphStyle('sl', fontName='Helvetica-Bold', fontSize=9,
-                                           textColor=COR, leading=12))]],
-                colWidths=[W],
-            )
-            sem_t.setStyle(TableStyle([
-                ('BACKGROUND',    (0, 0), (-1, -1), COR_SEM_BG),
-                ('TOPPADDING',    (0, 0), (-1, -1), 7),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 7),
-                ('LEFTPADDING',   (0, 0), (-1, -1), 10),
-                ('LINEBELOW',     (0, 0), (-1, -1), 1.2, COR),
-            ]))
-            elements.append(sem_t)
-
-            # Tabela de plantões
-            rows = [[
-                Paragraph('Data',        st_th),
-                Paragraph('Dia',         st_th),
-                Paragraph('Turno',       st_th),
-                Paragraph('Horário',     st_th),
-                Paragraph('Colaborador', st_th),
-                Paragraph('Observações', st_th),
-            ]]
-            for p in sd['plantoes']:
-                obs = (p.observacoes[:38] + '…') if p.observacoes and len(p.observacoes) > 38 else (p.observacoes or '—')
-                rows.append([
-                    Paragraph(p.data.strftime('%d/%m/%Y'),                              st_tdc),
-                    Paragraph(p.get_dia_semana_display(),                               st_tdc),
-                    Paragraph(p.get_turno_display(),                                    st_td),
-                    Paragraph(f"{p.hora_inicio.strftime('%H:%M')} – {p.hora_fim.strftime('%H:%M')}", st_tdc),
-                    Paragraph(p.colaborador.nome_completo,                              st_td),
-                    Paragraph(obs,                                                      st_td),
-                ])
-
-            row_bgs = [('BACKGROUND', (0, i), (-1, i),
-                        colors.white if i % 2 == 1 else COR_ZEBRA)
-                       for i in range(1, len(rows))]
-
-            t = Table(rows, colWidths=COL, repeatRows=1)
-            t.setStyle(TableStyle([
-                ('BACKGROUND',    (0, 0), (-1, 0), COR),
-                ('TOPPADDING',    (0, 0), (-1, -1), 7),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 7),
-                ('LEFTPADDING',   (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING',  (0, 0), (-1, -1), 8),
-                ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
-                ('LINEBELOW',     (0, 0), (-1, -1), 0.3, COR_BORDA),
-                ('LINEAFTER',     (0, 0), (-1, -1), 0.3, COR_BORDA),
-                *row_bgs,
-            ]))
-            elements.append(t)
-            elements.append(Spacer(1, 0.7 * cm))
+    if not tem_plantoes:
+        _pdf_vazio(elements)
 
     doc.build(elements, onFirstPage=_pdf_rodape, onLaterPages=_pdf_rodape)
-    buffer.seek(0)
-
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
     response['Content-Disposition'] = (
         f'attachment; filename="plantoes_sac_{hoje.strftime("%Y%m%d")}.pdf"'
     )
@@ -580,11 +644,11 @@ def solicitar_troca(request, plantao_id):
     meu_plantao = get_object_or_404(Plantao, id=plantao_id)
     colaborador_solicitante = get_user_colaborador(request.user)
     
-    if not colaborador_solicitante or meu_plantao.colaborador != colaborador_solicitante:
+    if not colaborador_solicitante or meu_plantao.colaborador_id != colaborador_solicitante.id:
         messages.error(request, '❌ Você só pode solicitar troca dos seus próprios plantões!')
         return redirect('dashboard')
     
-    if meu_plantao.data < datetime.now().date():
+    if meu_plantao.data < request.hoje:
         messages.error(request, '⏰ Não é possível trocar plantões que já passaram!')
         return redirect('dashboard')
     
@@ -592,53 +656,57 @@ def solicitar_troca(request, plantao_id):
         plantao_destino_id = request.POST.get('plantao_destino')
         mensagem = request.POST.get('mensagem', '')
         
-        plantao_destino = get_object_or_404(Plantao, id=plantao_destino_id)
+        plantao_destino = get_object_or_404(Plantao.objects.select_related('colaborador'), id=plantao_destino_id)
         
-        if plantao_destino.colaborador == colaborador_solicitante:
+        if plantao_destino.colaborador_id == colaborador_solicitante.id:
             messages.error(request, '❌ Você não pode trocar com você mesmo!')
             return redirect('solicitar_troca', plantao_id=plantao_id)
         
-        troca_existente = TrocaPlantao.objects.filter(
-            solicitante=colaborador_solicitante,
-            plantao_solicitante=meu_plantao,
-            plantao_destinatario=plantao_destino,
-            status='PENDENTE'
-        ).exists()
-        
-        if troca_existente:
+        # INSERT direto: a constraint uniq_troca_pendente recusa a duplicata, sem a
+        # consulta prévia e sem a janela de corrida entre consulta e INSERT. A
+        # notificação entra na mesma transação que a troca.
+        try:
+            with transaction.atomic():
+                troca = TrocaPlantao.objects.create(
+                    solicitante=colaborador_solicitante,
+                    plantao_solicitante=meu_plantao,
+                    destinatario=plantao_destino.colaborador,
+                    plantao_destinatario=plantao_destino,
+                    mensagem=mensagem,
+                    status='PENDENTE'
+                )
+                
+                Notificacao.objects.create(
+                    colaborador=plantao_destino.colaborador,
+                    tipo='TROCA_SOLICITADA',
+                    titulo='Nova Solicitação de Troca de Plantão',
+                    mensagem=f"{colaborador_solicitante.nome_completo} quer trocar o plantão de {meu_plantao.data.strftime('%d/%m/%Y')} pelo seu plantão de {plantao_destino.data.strftime('%d/%m/%Y')}.",
+                    troca=troca
+                )
+        except IntegrityError:
             messages.warning(request, '⚠️ Você já tem uma solicitação de troca pendente para este plantão!')
             return redirect('dashboard')
         
-        troca = TrocaPlantao.objects.create(
-            solicitante=colaborador_solicitante,
-            plantao_solicitante=meu_plantao,
-            destinatario=plantao_destino.colaborador,
-            plantao_destinatario=plantao_destino,
-            mensagem=mensagem,
-            status='PENDENTE'
-        )
-        
-        Notificacao.objects.create(
-            colaborador=plantao_destino.colaborador,
-            tipo='TROCA_SOLICITADA',
-            titulo='Nova Solicitação de Troca de Plantão',
-            mensagem=f"{colaborador_solicitante.nome_completo} quer trocar o plantão de {meu_plantao.data.strftime('%d/%m/%Y')} pelo seu plantão de {plantao_destino.data.strftime('%d/%m/%Y')}.",
-            troca=troca
-        )
-        
         messages.success(request, f'✅ Solicitação de troca enviada para {plantao_destino.colaborador.nome_completo}!')
         return redirect('minhas_trocas')
     
-    hoje = datetime.now().date()
-    plantoes_disponiveis = Plantao.objects.select_related('colaborador').filter(
+    hoje = request.hoje
+    # A lista não mostra observações: só as colunas que o template usa
+    plantoes_disponiveis = Plantao.objects.select_related('colaborador').only(
+        'id', 'data', 'dia_semana', 'turno', 'hora_inicio', 'hora_fim',
+        'colaborador__id', 'colaborador__nome_completo',
+    ).filter(
         data__gte=hoje
     ).exclude(
         colaborador=colaborador_solicitante
     ).order_by('data', 'hora_inicio')
     
+    page_obj = Paginator(plantoes_disponiveis, _PLANTOES_POR_PAGINA).get_page(request.GET.get('page'))
+    
     context = {
         'meu_plantao': meu_plantao,
-        'plantoes_disponiveis': plantoes_disponiveis,
+        'plantoes_disponiveis': page_obj,
+        'page_obj': page_obj,
     }
     
     return render(request, 'dashboard/solicitar_troca.html', context)
@@ -678,46 +746,55 @@ def minhas_trocas(request):
 def responder_troca(request, troca_id, acao):
     """Aceitar ou recusar uma solicitação de troca"""
     
-    troca = get_object_or_404(TrocaPlantao, id=troca_id)
     colaborador = get_user_colaborador(request.user)
     
-    if troca.destinatario != colaborador:
-        messages.error(request, '❌ Você não pode responder esta solicitação!')
-        return redirect('minhas_trocas')
-    
-    if troca.status != 'PENDENTE':
-        messages.warning(request, '⚠️ Esta solicitação já foi respondida!')
-        return redirect('minhas_trocas')
-    
-    try:
-        if acao == 'aceitar':
-            troca.aceitar_troca()
-            
-            Notificacao.objects.create(
-                colaborador=troca.solicitante,
-                tipo='TROCA_ACEITA',
-                titulo='Troca de Plantão Aceita! 🎉',
-                mensagem=f"{troca.destinatario.nome_completo} aceitou trocar plantões com você!",
-                troca=troca
-            )
-            
-            messages.success(request, '✅ Troca aceita com sucesso! Os plantões foram trocados.')
-            
-        elif acao == 'recusar':
-            troca.recusar_troca()
-            
-            Notificacao.objects.create(
-                colaborador=troca.solicitante,
-                tipo='TROCA_RECUSADA',
-                titulo='Troca de Plantão Recusada',
-                mensagem=f"{troca.destinatario.nome_completo} recusou sua solicitação de troca.",
-                troca=troca
-            )
-            
-            messages.info(request, '❌ Troca recusada.')
-    
-    except ValueError as e:
-        messages.error(request, f'❌ Erro: {str(e)}')
+    # Troca, plantões e notificação numa só transação; a linha da troca fica travada
+    # até o fim para que duas respostas simultâneas não passem ambas pelo PENDENTE
+    with transaction.atomic():
+        troca = get_object_or_404(
+            TrocaPlantao.objects.select_for_update().select_related(
+                'solicitante', 'destinatario', 'plantao_solicitante', 'plantao_destinatario'
+            ),
+            id=troca_id,
+        )
+        
+        if not colaborador or troca.destinatario_id != colaborador.id:
+            messages.error(request, '❌ Você não pode responder esta solicitação!')
+            return redirect('minhas_trocas')
+        
+        if troca.status != 'PENDENTE':
+            messages.warning(request, '⚠️ Esta solicitação já foi respondida!')
+            return redirect('minhas_trocas')
+        
+        try:
+            if acao == 'aceitar':
+                troca.aceitar_troca()
+                
+                Notificacao.objects.create(
+                    colaborador=troca.solicitante,
+                    tipo='TROCA_ACEITA',
+                    titulo='Troca de Plantão Aceita! 🎉',
+                    mensagem=f"{troca.destinatario.nome_completo} aceitou trocar plantões com você!",
+                    troca=troca
+                )
+                
+                messages.success(request, '✅ Troca aceita com sucesso! Os plantões foram trocados.')
+                
+            elif acao == 'recusar':
+                troca.recusar_troca()
+                
+                Notificacao.objects.create(
+                    colaborador=troca.solicitante,
+                    tipo='TROCA_RECUSADA',
+                    titulo='Troca de Plantão Recusada',
+                    mensagem=f"{troca.destinatario.nome_completo} recusou sua solicitação de troca.",
+                    troca=troca
+                )
+                
+                messages.info(request, '❌ Troca recusada.')
+        
+        except ValueError as e:
+            messages.error(request, f'❌ Erro: {str(e)}')
     
     return redirect('minhas_trocas')
 
@@ -726,32 +803,37 @@ def responder_troca(request, troca_id, acao):
 def cancelar_troca(request, troca_id):
     """Cancela uma solicitação de troca (apenas o solicitante)"""
     
-    troca = get_object_or_404(TrocaPlantao, id=troca_id)
     colaborador = get_user_colaborador(request.user)
     
-    if troca.solicitante != colaborador:
-        messages.error(request, '❌ Você não pode cancelar esta solicitação!')
-        return redirect('minhas_trocas')
-    
-    if troca.status != 'PENDENTE':
-        messages.warning(request, '⚠️ Não é possível cancelar esta solicitação!')
-        return redirect('minhas_trocas')
-    
-    try:
-        troca.cancelar_troca()
-        
-        Notificacao.objects.create(
-            colaborador=troca.destinatario,
-            tipo='TROCA_CANCELADA',
-            titulo='Solicitação de Troca Cancelada',
-            mensagem=f"{troca.solicitante.nome_completo} cancelou a solicitação de troca.",
-            troca=troca
+    with transaction.atomic():
+        troca = get_object_or_404(
+            TrocaPlantao.objects.select_for_update().select_related('solicitante', 'destinatario'),
+            id=troca_id,
         )
         
-        messages.success(request, '✅ Solicitação cancelada com sucesso!')
-    
-    except ValueError as e:
-        messages.error(request, f'❌ Erro: {str(e)}')
+        if not colaborador or troca.solicitante_id != colaborador.id:
+            messages.error(request, '❌ Você não pode cancelar esta solicitação!')
+            return redirect('minhas_trocas')
+        
+        if troca.status != 'PENDENTE':
+            messages.warning(request, '⚠️ Não é possível cancelar esta solicitação!')
+            return redirect('minhas_trocas')
+        
+        try:
+            troca.cancelar_troca()
+            
+            Notificacao.objects.create(
+                colaborador=troca.destinatario,
+                tipo='TROCA_CANCELADA',
+                titulo='Solicitação de Troca Cancelada',
+                mensagem=f"{troca.solicitante.nome_completo} cancelou a solicitação de troca.",
+                troca=troca
+            )
+            
+            messages.success(request, '✅ Solicitação cancelada com sucesso!')
+        
+        except ValueError as e:
+            messages.error(request, f'❌ Erro: {str(e)}')
     
     return redirect('minhas_trocas')
 
@@ -764,10 +846,6 @@ def notificacoes(request):
     if not colaborador:
         return redirect('dashboard')
     
-    todas_notificacoes = Notificacao.objects.filter(
-        colaborador=colaborador
-    ).select_related('troca').order_by('-criado_em')
-    
     if request.method == 'POST':
         notif_id = request.POST.get('notificacao_id')
         if notif_id:
@@ -775,9 +853,19 @@ def notificacoes(request):
             if notif:
                 notif.marcar_como_lida()
     
+    # Lida uma vez (depois de marcar a lida, se houver); o total de não lidas sai da
+    # mesma lista em vez de um COUNT à parte. Da troca, o template só usa id e status.
+    todas_notificacoes = list(
+        Notificacao.objects.filter(
+            colaborador=colaborador
+        ).select_related('troca').only(
+            'id', 'tipo', 'titulo', 'mensagem', 'lida', 'criado_em', 'troca__id', 'troca__status',
+        ).order_by('-criado_em')
+    )
+    
     context = {
         'notificacoes': todas_notificacoes,
-        'nao_lidas': todas_notificacoes.filter(lida=False).count(),
+        'nao_lidas': sum(1 for notif in todas_notificacoes if not notif.lida),
     }
     
     return render(request, 'dashboard/notificacoes.html', context)
@@ -802,6 +890,8 @@ def notificacoes_processor(request):
     if request.user.is_authenticated:
         colaborador = get_user_colaborador(request.user)
         if colaborador:
+            # Contagem direta a cada página: o índice parcial notif_unread_idx (colaborador, só não lidas)
+            # deixa a consulta barata, e um cache por processo ficaria defasado entre workers
             nao_lidas = Notificacao.objects.filter(
                 colaborador=colaborador,
                 lida=False
@@ -818,30 +908,37 @@ def dashboard_tecnicos(request):
     
     from .models import PlantaoTecnico, TecnicoCampo
     
-    user_type = get_user_type(request.user)
+    user_type = request.user_type
+    admin_flag = user_type == 'admin'
     
     # 🔴 CRÍTICO: Se for colaborador SAC, redireciona para dashboard SAC
     if user_type == 'colaborador':
         messages.warning(request, '⚠️ Você é um colaborador SAC.')
         return redirect('dashboard')
     
-    plantoes = PlantaoTecnico.objects.select_related('tecnico_principal', 'tecnico_dupla').all()
+    # Só as colunas que o template usa (inclusive o nome dos dois técnicos)
+    plantoes = PlantaoTecnico.objects.select_related('tecnico_principal', 'tecnico_dupla').only(
+        'id', 'data', 'tipo', 'hora_inicio', 'hora_fim', 'observacoes',
+        'tecnico_principal__id', 'tecnico_principal__nome_completo',
+        'tecnico_dupla__id', 'tecnico_dupla__nome_completo',
+    )
     
     # Se for técnico (não admin), mostra apenas seus plantões
     if user_type == 'tecnico':
-        try:
-            tecnico = TecnicoCampo.objects.get(user=request.user)
+        # Já carregado junto com o tipo do usuário: não vai ao banco de novo
+        tecnico = get_user_tecnico(request.user)
+        if tecnico:
             plantoes = plantoes.filter(
-                Q(tecnico_principal=tecnico) | Q(tecnico_dupla=tecnico)
+                Q(tecnico_principal_id=tecnico.id) | Q(tecnico_dupla_id=tecnico.id)
             )
-        except TecnicoCampo.DoesNotExist:
+        else:
             plantoes = PlantaoTecnico.objects.none()
             messages.info(request, 'ℹ️ Você ainda não está vinculado a um técnico.')
     
     # ===== APLICAR FILTROS (Admin apenas) =====
     filtros_aplicados = False
     
-    if is_admin(request.user):
+    if admin_flag:
         data_inicio_filtro = request.GET.get('data_inicio')
         data_fim_filtro = request.GET.get('data_fim')
         tipo_filtro = request.GET.get('tipo')
@@ -869,7 +966,7 @@ def dashboard_tecnicos(request):
     # ===== FILTRO PADRÃO (apenas se NÃO houver filtros manuais) =====
     # 🔧 CORREÇÃO DO BUG: Começar do início da SEMANA ATUAL, não de hoje!
     if not filtros_aplicados:
-        hoje = datetime.now().date()
+        hoje = request.hoje
         
         # Calcular início da semana atual (segunda-feira = dia 0)
         inicio_semana_atual = hoje - timedelta(days=hoje.weekday())
@@ -877,32 +974,22 @@ def dashboard_tecnicos(request):
         # Mostrar desde o início da semana atual até 8 semanas completas
         data_fim = inicio_semana_atual + timedelta(weeks=8) - timedelta(days=1)
         
-        plantoes = plantoes.filter(data__gte=inicio_semana_atual, data__lte=data_fim)
+        plantoes = plantoes.filter(data__range=(inicio_semana_atual, data_fim))
     
-    # Ordenar por data
-    plantoes = plantoes.order_by('data', 'hora_inicio')
+    # Ordenar por data e materializar uma única vez (agrupamento + total)
+    plantoes = list(plantoes.order_by('data', 'hora_inicio'))
     
-    # Agrupar por semana
-    plantoes_agrupados = {}
-    for plantao in plantoes:
-        inicio_semana = plantao.data - timedelta(days=plantao.data.weekday())
-        semana_key = inicio_semana.strftime('%Y-%m-%d')
-        
-        if semana_key not in plantoes_agrupados:
-            plantoes_agrupados[semana_key] = {
-                'inicio': inicio_semana,
-                'fim': inicio_semana + timedelta(days=6),
-                'plantoes': []
-            }
-        plantoes_agrupados[semana_key]['plantoes'].append(plantao)
-    
-    plantoes_agrupados = dict(sorted(plantoes_agrupados.items()))
+    # Agrupar por semana (a lista já vem em ordem de data, logo de semana)
+    plantoes_agrupados = {
+        semana_key: {'inicio': inicio_semana, 'fim': fim_semana, 'plantoes': plantoes_semana}
+        for inicio_semana, fim_semana, semana_key, plantoes_semana in _iter_semanas(plantoes)
+    }
     
     context = {
         'plantoes_agrupados': plantoes_agrupados,
-        'total_plantoes': plantoes.count(),
+        'total_plantoes': len(plantoes),
         'tecnicos_count': TecnicoCampo.objects.filter(ativo=True).count(),
-        'is_admin': is_admin(request.user),
+        'is_admin': admin_flag,
         'is_tecnico': user_type == 'tecnico',
         'user_type': user_type,
     }
@@ -914,195 +1001,134 @@ def dashboard_tecnicos(request):
 def exportar_pdf_tecnicos(request):
     """Exporta plantões técnicos em PDF — portrait A4."""
 
-    from .models import PlantaoTecnico, TecnicoCampo
-
-    COR        = colors.HexColor('#E94920')
-    COR_TEXTO  = colors.HexColor('#50443C')
-    COR_ZEBRA  = colors.HexColor('#fdf5f3')
-    COR_BORDA  = colors.HexColor('#e5e7eb')
-    COR_SEM_BG = colors.HexColor('#fff8f6')
-
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=1.5 * cm,
-        leftMargin=1.5 * cm,
-        topMargin=2 * cm,
-        bottomMargin=2.2 * cm,
-    )
-    W = doc.width
+    from .models import PlantaoTecnico
 
     # ── Dados ──────────────────────────────────────────────────────────────
-    hoje     = datetime.now().date()
+    hoje     = request.hoje
     data_fim = hoje + timedelta(weeks=4)
 
-    plantoes = (
-        PlantaoTecnico.objects
-        .select_related('tecnico_principal', 'tecnico_dupla')
-        .all()
-    )
+    plantoes = PlantaoTecnico.objects.all()
 
-    user_type = get_user_type(request.user)
+    user_type = request.user_type
     if user_type == 'tecnico':
-        try:
-            tecnico  = TecnicoCampo.objects.get(user=request.user)
+        tecnico = get_user_tecnico(request.user)
+        if tecnico:
             plantoes = plantoes.filter(
                 Q(tecnico_principal=tecnico) | Q(tecnico_dupla=tecnico)
             )
             titulo = f"Meus Plantões — {tecnico.nome_completo}"
-        except TecnicoCampo.DoesNotExist:
+            escopo = f'tec{tecnico.pk}-{tecnico.atualizado_em.isoformat()}'
+        else:
             plantoes = PlantaoTecnico.objects.none()
             titulo   = "Meus Plantões"
+            escopo   = 'sem_tecnico'
     else:
         titulo = "Escala de Plantões — Técnicos de Campo"
+        escopo = 'todos'
 
     plantoes = plantoes.filter(
         data__gte=hoje, data__lte=data_fim
     ).order_by('data', 'hora_inicio')
 
-    # ── Estilos ─────────────────────────────────────────────────────────────
-    def st(name, **kw):
-        defaults = dict(fontName='Helvetica', fontSize=9, textColor=COR_TEXTO, leading=12)
-        defaults.update(kw)
-        return ParagraphStyle(name, **defaults)
-
-    st_th  = st('th', fontName='Helvetica-Bold', fontSize=8,
-                textColor=colors.white, alignment=TA_CENTER, leading=11)
-    st_td  = st('td', fontSize=8, leading=11)
-    st_tdc = st('tdc', fontSize=8, leading=11, alignment=TA_CENTER)
+    nome_arquivo = f'attachment; filename="plantoes_tecnicos_{hoje.strftime("%Y%m%d")}.pdf"'
+
+    # ── Cache ──────────────────────────────────────────────────────────────
+    # A chave leva o escopo (técnico ou escala toda), o dia e a "versão" dos dados:
+    # quantidade e última alteração dos plantões do período e dos técnicos impressos.
+    # Inserir, editar, excluir ou renomear gera outra chave; a antiga só expira.
+    versao = plantoes.aggregate(
+        total=Count('id'),
+        plantao=Max('atualizado_em'),
+        principal=Max('tecnico_principal__atualizado_em'),
+        dupla=Max('tecnico_dupla__atualizado_em'),
+    )
+    cache_key = ':'.join([
+        'pdf_tecnicos',
+        escopo,
+        hoje.isoformat(),
+        str(versao['total']),
+        *(v.isoformat() if v else '-' for v in (versao['plantao'], versao['principal'], versao['dupla'])),
+    ])
+    # A mesma chave serve de ETag; fraca porque o rodapé traz a hora em que foi gerado
+    etag = f'W/"{hashlib.md5(cache_key.encode(), usedforsecurity=False).hexdigest()}"'
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        return _pdf_versionado(response, etag)
+
+    pdf = cache.get(cache_key)
+    if pdf is not None:
+        response = HttpResponse(pdf, content_type='application/pdf')
+        response['Content-Disposition'] = nome_arquivo
+        return _pdf_versionado(response, etag)
+
+    # O HttpResponse é file-like: o ReportLab escreve direto no corpo, sem
+    # buffer intermediário nem a cópia de getvalue()
+    response = HttpResponse(content_type='application/pdf')
+    doc = SimpleDocTemplate(
+        response,
+        pagesize=A4,
+        rightMargin=1.5 * cm,
+        leftMargin=1.5 * cm,
+        topMargin=2 * cm,
+        bottomMargin=2.2 * cm,
+    )
+    W = doc.width
 
     elements = []
 
     # ── Cabeçalho do documento ──────────────────────────────────────────────
-    hdr = Table(
-        [[Paragraph(f'<b>{titulo}</b>',
-                    ParagraphStyle('ht', fontName='Helvetica-Bold', fontSize=13,
-                                   textColor=colors.white, alignment=TA_CENTER, leading=16))]],
-        colWidths=[W],
-    )
-    hdr.setStyle(TableStyle([
-        ('BACKGROUND',    (0, 0), (-1, -1), COR),
-        ('TOPPADDING',    (0, 0), (-1, -1), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 11),
-        ('LEFTPADDING',   (0, 0), (-1, -1), 14),
-        ('RIGHTPADDING',  (0, 0), (-1, -1), 14),
-    ]))
-    elements.append(hdr)
-    elements.append(Spacer(1, 0.25 * cm))
-    elements.append(Paragraph(
-        f"Período: {hoje.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}",
-        ParagraphStyle('sub', fontName='Helvetica', fontSize=8,
-                       textColor=colors.HexColor('#9ca3af'),
-                       alignment=TA_CENTER, spaceAfter=14),
-    ))
+    _pdf_cabecalho(elements, titulo, W, hoje, data_fim)
 
     # ── Agrupar por semana ──────────────────────────────────────────────────
-    semanas = {}
-    for p in plantoes:
-        ini = p.data - timedelta(days=p.data.weekday())
-        k   = ini.strftime('%Y-%m-%d')
-        if k not in semanas:
-            semanas[k] = {'inicio': ini, 'fim': ini + timedelta(days=6), 'plantoes': []}
-        semanas[k]['plantoes'].append(p)
-
-    if not semanas:
-        elements.append(Spacer(1, 1.5 * cm))
-        elements.append(Paragraph(
-            "Nenhum plantão encontrado para este período.",
-            ParagraphStyle('vz', fontName='Helvetica', fontSize=10,
-                           textColor=colors.grey, alignment=TA_CENTER),
-        ))
-    else:
-        TIPO_MAP = {'SABADO_DUPLA': 'Dupla', 'DOMINGO_SOLO': 'Solo', 'AVULSO_SOLO': 'Avulso'}
-        DIAS     = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sáb', 'Dom']
-
-        # Colunas — portrait A4 (~18 cm útil)
-        COL = [2.1*cm, 1.6*cm, 2.5*cm, 2.8*cm, 5.3*cm, 3.7*cm]
-
-        for k in sorted(semanas):
-            sd    = semanas[k]
-            label = f"Semana de {sd['inicio'].strftime('%d/%m/%Y')} a {sd['fim'].strftime('%d/%m/%Y')}"
-
-            # Faixa de semana
-            sem_t = Table(
-                [[Paragraph(f'<b>{label}</b>',
-                            ParagraphStyle('sl', fontName='Helvetica-Bold', fontSize=9,
-                                           textColor=COR, leading=12))]],
-                colWidths=[W],
-            )
-            sem_t.setStyle(TableStyle([
-                ('BACKGROUND',    (0, 0), (-1, -1), COR_SEM_BG),
-                ('TOPPADDING',    (0, 0), (-1, -1), 7),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 7),
-                ('LEFTPADDING',   (0, 0), (-1, -1), 10),
-                ('LINEBELOW',     (0, 0), (-1, -1), 1.2, COR),
-            ]))
-            elements.append(sem_t)
-
-            # Tabela de plantões
-            rows = [[
-                Paragraph('Data',       st_th),
-                Paragraph('Dia',        st_th),
-                Paragraph('Tipo',       st_th),
-                Paragraph('Horário',    st_th),
-                Paragraph('Técnico(s)', st_th),
-                Paragraph('Obs.',       st_th),
-            ]]
-
-            for p in sd['plantoes']:
-                tipo = TIPO_MAP.get(p.tipo, p.tipo)
-                dia  = DIAS[p.data.weekday()]
-                obs  = (p.observacoes[:38] + '…') if p.observacoes and len(p.observacoes) > 38 else (p.observacoes or '—')
-
-                if p.tecnico_dupla:
-                    tecs = Paragraph(
-                        f"{p.tecnico_principal.nome_completo}<br/>"
-                        f"<font size='7' color='#9ca3af'>+ {p.tecnico_dupla.nome_completo}</font>",
-                        st_td,
-                    )
-                else:
-                    tecs = Paragraph(p.tecnico_principal.nome_completo, st_td)
-
-                rows.append([
-                    Paragraph(p.data.strftime('%d/%m/%Y'),                              st_tdc),
-                    Paragraph(dia,                                                       st_tdc),
-                    Paragraph(tipo,                                                      st_tdc),
-                    Paragraph(f"{p.hora_inicio.strftime('%H:%M')} – {p.hora_fim.strftime('%H:%M')}", st_tdc),
-                    tecs,
-                    Paragraph(obs, st_td),
-                ])
-
-            row_bgs = [('BACKGROUND', (0, i), (-1, i),
-                        colors.white if i % 2 == 1 else COR_ZEBRA)
-                       for i in range(1, len(rows))]
-
-            t = Table(rows, colWidths=COL, repeatRows=1)
-            t.setStyle(TableStyle([
-                ('BACKGROUND',    (0, 0), (-1, 0), COR),
-                ('TOPPADDING',    (0, 0), (-1, -1), 7),
-                ('BOTTOMPADDING', (0, 0), (-1, -1), 7),
-                ('LEFTPADDING',   (0, 0), (-1, -1), 8),
-                ('RIGHTPADDING',  (0, 0), (-1, -1), 8),
-                ('VALIGN',        (0, 0), (-1, -1), 'MIDDLE'),
-                ('LINEBELOW',     (0, 0), (-1, -1), 0.3, COR_BORDA),
-                ('LINEAFTER',     (0, 0), (-1, -1), 0.3, COR_BORDA),
-                *row_bgs,
-            ]))
-            elements.append(t)
-            elements.append(Spacer(1, 0.7 * cm))
+    # Só as colunas impressas, em tuplas nomeadas (os nomes vêm pelo JOIN)
+    semanas = _iter_semanas(
+        plantoes
+        .annotate(obs=_PDF_OBS)
+        .values_list('data', 'tipo', 'hora_inicio', 'hora_fim', 'tecnico_principal__nome_completo',
+                     'tecnico_dupla__nome_completo', 'obs', named=True)
+        .iterator(chunk_size=500)
+    )
 
-    doc.build(elements, onFirstPage=_pdf_rodape, onLaterPages=_pdf_rodape)
-    buffer.seek(0)
+    tem_plantoes = False
+    for ini, fim, _, plantoes_semana in semanas:
+        tem_plantoes = True
+        # Tabela de plantões
+        rows = [['Data', 'Dia', 'Tipo', 'Horário', 'Técnico(s)', 'Obs.']]
+
+        for p in plantoes_semana:
+            tipo = _PDF_TIPO_MAP.get(p.tipo, p.tipo)
+            data, dia = _pdf_data(p.data)
+            obs  = _pdf_obs(p.obs)
+
+            if p.tecnico_dupla__nome_completo:
+                tecs = Paragraph(
+                    f"{p.tecnico_principal__nome_completo}<br/>"
+                    f"<font size='7' color='#9ca3af'>+ {p.tecnico_dupla__nome_completo}</font>",
+                    _PDF_ST_TD,
+                )
+            else:
+                tecs = Paragraph(p.tecnico_principal__nome_completo, _PDF_ST_TD)
 
-    response = HttpResponse(buffer.getvalue(), content_type='application/pdf')
-    response['Content-Disposition'] = (
-        f'attachment; filename="plantoes_tecnicos_{hoje.strftime("%Y%m%d")}.pdf"'
-    )
-    return response
+            rows.append([
+                data,
+                dia,
+                tipo,
+                _pdf_horario(p.hora_inicio, p.hora_fim),
+                tecs,
+                Paragraph(obs, _PDF_ST_TD),
+            ])
+
+        _pdf_semana(elements, ini, fim, W, rows, _PDF_COL_TECNICOS)
+
+    if not tem_plantoes:
+        _pdf_vazio(elements)
+
+    doc.build(elements, onFirstPage=_pdf_rodape, onLaterPages=_pdf_rodape)
+    cache.set(cache_key, response.content, _PDF_CACHE_TTL)
+    response['Content-Disposition'] = nome_arquivo
+    return _pdf_versionado(response, etag)
 
 
-@login_required
 @admin_required
 def cadastrar_plantao_tecnico(request):
     """Cadastrar plantão de técnico manualmente"""
@@ -1117,10 +1143,9 @@ def cadastrar_plantao_tecnico(request):
         observacoes = request.POST.get('observacoes', '')
         
         try:
-            tecnico_principal = TecnicoCampo.objects.get(id=tecnico_principal_id)
-            
+            # Só os ids: a FK do banco valida os técnicos no INSERT, sem um SELECT para cada
             plantao = PlantaoTecnico(
-                tecnico_principal=tecnico_principal,
+                tecnico_principal_id=tecnico_principal_id,
                 data=data,
                 tipo=tipo,
                 observacoes=observacoes
@@ -1131,13 +1156,14 @@ def cadastrar_plantao_tecnico(request):
                     messages.error(request, '⚠️ Plantão de sábado precisa de dupla!')
                     return redirect('cadastrar_plantao_tecnico')
                 
-                tecnico_dupla = TecnicoCampo.objects.get(id=tecnico_dupla_id)
-                plantao.tecnico_dupla = tecnico_dupla
+                plantao.tecnico_dupla_id = tecnico_dupla_id
             
             plantao.save()
             messages.success(request, '✅ Plantão técnico cadastrado com sucesso!')
             return redirect('dashboard_tecnicos')
             
+        except IntegrityError:
+            messages.error(request, '❌ Técnico inexistente ou já existe um plantão deste tipo nesta data.')
         except Exception as e:
             messages.error(request, f'❌ Erro: {str(e)}')
     
@@ -1150,7 +1176,6 @@ def cadastrar_plantao_tecnico(request):
     return render(request, 'dashboard/tecnicos/cadastrar_plantao.html', context)
 
 
-@login_required
 @admin_required
 def gerar_escala_tecnicos(request):
     """Gera escala automática para técnicos"""
@@ -1170,13 +1195,15 @@ def gerar_escala_tecnicos(request):
                     dias_ate_sabado = 7
                 data_inicio = data_inicio + timedelta(days=dias_ate_sabado)
             
-            plantoes_criados = _criar_plantoes_tecnicos(data_inicio, semanas)
-            
-            EscalaAutomaticaTecnico.objects.create(
-                criada_por=request.user,
-                data_inicio=data_inicio,
-                semanas_gerar=semanas
-            )
+            # Plantões e registro da escala numa única transação
+            with transaction.atomic():
+                plantoes_criados = _criar_plantoes_tecnicos(data_inicio, semanas)
+                
+                EscalaAutomaticaTecnico.objects.create(
+                    criada_por=request.user,
+                    data_inicio=data_inicio,
+                    semanas_gerar=semanas
+                )
             
             messages.success(request, f'✅ Escala gerada! {plantoes_criados} plantões criados.')
             return redirect('dashboard_tecnicos')
@@ -1184,7 +1211,7 @@ def gerar_escala_tecnicos(request):
         except Exception as e:
             messages.error(request, f'❌ Erro: {str(e)}')
     
-    hoje = datetime.now().date()
+    hoje = request.hoje
     dias_ate_sabado = (5 - hoje.weekday()) % 7
     if dias_ate_sabado == 0:
         dias_ate_sabado = 7
@@ -1207,7 +1234,7 @@ def _criar_plantoes_tecnicos(data_inicio, semanas):
     if len(tecnicos) < 2:
         raise ValueError('É necessário ter pelo menos 2 técnicos ativos!')
     
-    plantoes_criados = 0
+    plantoes = []
     indice = 0
     
     for semana in range(semanas):
@@ -1216,46 +1243,39 @@ def _criar_plantoes_tecnicos(data_inicio, semanas):
         
         tec1 = tecnicos[indice % len(tecnicos)]
         tec2 = tecnicos[(indice + 1) % len(tecnicos)]
-        
-        PlantaoTecnico.objects.create(
-            tecnico_principal=tec1,
-            tecnico_dupla=tec2,
-            data=sabado,
-            tipo='SABADO_DUPLA'
-        )
-        plantoes_criados += 1
-        
         tec_domingo = tecnicos[(indice + 2) % len(tecnicos)]
         
-        PlantaoTecnico.objects.create(
-            tecnico_principal=tec_domingo,
-            data=domingo,
-            tipo='DOMINGO_SOLO'
-        )
-        plantoes_criados += 1
+        plantoes += [
+            PlantaoTecnico.build(tec1, sabado, 'SABADO_DUPLA', tecnico_dupla=tec2),
+            PlantaoTecnico.build(tec_domingo, domingo, 'DOMINGO_SOLO'),
+        ]
         
         indice += 3
     
-    return plantoes_criados
+    # Um INSERT por lote em vez de um por plantão (bulk_create não chama save())
+    PlantaoTecnico.objects.bulk_create(plantoes, batch_size=500)
+    
+    return len(plantoes)
 
 
-@login_required
 @admin_required
 def gerenciar_tecnicos(request):
     """Lista todos os técnicos"""
     
     from .models import TecnicoCampo
     
-    tecnicos = TecnicoCampo.objects.all().order_by('ordem_fila')
+    # ordem_fila pode repetir: o id desempata para as páginas não se sobreporem
+    tecnicos = TecnicoCampo.objects.select_related('user').order_by('ordem_fila', 'id')
+    page_obj = Paginator(tecnicos, _TECNICOS_POR_PAGINA).get_page(request.GET.get('page'))
     
     context = {
-        'tecnicos': tecnicos,
+        'tecnicos': page_obj,
+        'page_obj': page_obj,
     }
     
     return render(request, 'dashboard/tecnicos/gerenciar_tecnicos.html', context)
 
 
-@login_required
 @admin_required
 def cadastrar_tecnico(request):
     """Cadastrar novo técnico"""
@@ -1280,7 +1300,8 @@ def cadastrar_tecnico(request):
         messages.success(request, f'✅ Técnico {nome} cadastrado!')
         return redirect('gerenciar_tecnicos')
     
-    ultima_ordem = TecnicoCampo.objects.count()
+    # Próxima posição depois do último da fila (MAX pelo índice, sem COUNT(*))
+    ultima_ordem = TecnicoCampo.objects.aggregate(m=Max('ordem_fila'))['m'] or 0
     
     context = {
         'ordem_sugerida': ultima_ordem + 1,
@@ -1289,14 +1310,15 @@ def cadastrar_tecnico(request):
     return render(request, 'dashboard/tecnicos/cadastrar_tecnico.html', context)
 
 
-@login_required
 @admin_required
 def editar_plantao_tecnico(request, plantao_id):
     """Editar plantão de técnico"""
     
     from .models import PlantaoTecnico, TecnicoCampo
     
-    plantao = get_object_or_404(PlantaoTecnico, id=plantao_id)
+    plantao = get_object_or_404(
+        PlantaoTecnico.objects.select_related('tecnico_principal', 'tecnico_dupla'), id=plantao_id
+    )
     
     if request.method == 'POST':
         plantao.tecnico_principal_id = request.POST.get('tecnico_principal')
@@ -1320,14 +1342,15 @@ def editar_plantao_tecnico(request, plantao_id):
     return render(request, 'dashboard/tecnicos/editar_plantao.html', context)
 
 
-@login_required
 @admin_required
 def deletar_plantao_tecnico(request, plantao_id):
     """Deletar plantão de técnico"""
     
     from .models import PlantaoTecnico
     
-    plantao = get_object_or_404(PlantaoTecnico, id=plantao_id)
+    plantao = get_object_or_404(
+        PlantaoTecnico.objects.select_related('tecnico_principal', 'tecnico_dupla'), id=plantao_id
+    )
     
     if request.method == 'POST':
         plantao.delete()
@@ -1341,7 +1364,6 @@ def deletar_plantao_tecnico(request, plantao_id):
     return render(request, 'dashboard/tecnicos/confirmar_delete.html', context)
 
 
-@login_required
 @admin_required
 def editar_tecnico(request, tecnico_id):
     """Editar técnico existente"""
@@ -8,10 +8,11 @@ from django.contrib.auth.views import (
 )
 from django.urls import reverse_lazy
 from django.contrib import messages
+from apps.plantao.utils import get_user_groups
 
 @login_required
 def dashboard(request):
-    if request.user.groups.filter(name='Administrador').exists():
+    if 'Administrador' in get_user_groups(request.user):
         return render(request, 'dashboard/admin.html')
     
     return render(request, 'dashboard/colaborador.html')
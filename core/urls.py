@@ -1,8 +1,7 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
-from django.shortcuts import redirect
-from django.urls import path
+from django.views.generic import RedirectView
 from django.conf import settings # new
 from  django.conf.urls.static import static #new
 from apps.usuarios.views import (
@@ -26,7 +25,7 @@ urlpatterns = [
     # path('usuarios/', include('apps.usuarios.urls')),
     
     # Redirecionamento da raiz - DEVE SER O ÚLTIMO
-    path('', lambda request: redirect('dashboard')),
+    path('', RedirectView.as_view(pattern_name='dashboard')),
 
     # Recuperação de senha
     path('password-reset/', CustomPasswordResetView.as_view(), name='password_reset'),